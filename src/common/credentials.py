@@ -1,7 +1,29 @@
 import os
+import threading
 from dotenv import load_dotenv
 from src.common.sla_reporter.logger import logger
 
+# mtime and size of the .env file as last loaded into the environment.
+_loaded_env_signature = None
+_env_lock = threading.Lock()
+
+
+def _load_env_if_changed(env_path):
+    global _loaded_env_signature
+    try:
+        stat = os.stat(env_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+    with _env_lock:
+        if signature is not None and signature == _loaded_env_signature:
+            return
+        if signature is None:
+            logger.warning(f"Warning: .env file not found at {env_path}")
+        load_dotenv(dotenv_path=env_path, override=True)
+        _loaded_env_signature = signature
+
+
 class Credentials:
     def __init__(self):
         # Determine the path to the .env file relative to the current script
@@ -10,9 +32,8 @@ class Credentials:
         project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
         env_path = os.path.join(project_root, '.env')
 
-        if not os.path.exists(env_path):
-            logger.warning(f"Warning: .env file not found at {env_path}")
-        load_dotenv(dotenv_path=env_path, override=True)
+        # Re-read .env only when it has changed since the last Credentials was created.
+        _load_env_if_changed(env_path)
 
     def get_jira_credentials(self):
         logger.info("get_jira_credentials method called.")
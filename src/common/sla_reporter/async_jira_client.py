@@ -0,0 +1,257 @@
+import asyncio
+from typing import List
+
+import httpx
+
+from .config import Config
+from .logger import logger
+from .epic_cache import get_epic_link_cache
+from .issue_records import compact_histories, records_from_raw
+from .models import IssueRecord
+from .jira_client import (
+    EPIC_LINK_FIELD,
+    REPORT_FIELDS,
+    PARENT_LOOKUP_BATCH_SIZE,
+    CHANGELOG_PAGE_SIZE,
+    DEFAULT_SEARCH_PAGE_SIZE,
+    KEY_LISTING_PAGE_SIZE,
+)
+from .request_governor import RequestGovernor, THROTTLE_STATUSES, get_governor, throttle_pause
+
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 60
+
+
+class AsyncJiraClient:
+    """Non-blocking counterpart of SlaJiraClient's fetch methods.
+
+    Every request goes through one ``httpx.AsyncClient`` and the host's
+    RequestGovernor, so searches, page fetches, parent lookups and changelog
+    reads from concurrent reports all run on the event loop while the
+    requests in flight against Jira stay within what it allows. Searches
+    read the raw JSON into IssueRecords, like SlaJiraClient.search_records.
+    """
+
+    def __init__(self, server, email, api_token, governor=None, page_size=DEFAULT_SEARCH_PAGE_SIZE,
+                 is_cloud=None, epic_link_cache=None, timeout=DEFAULT_REQUEST_TIMEOUT_SECONDS, transport=None):
+        self.server = server.rstrip("/")
+        self.page_size = page_size
+        self.epic_link_cache = epic_link_cache
+        self.governor = governor or RequestGovernor(name=self.server)
+        self._is_cloud = is_cloud
+        self._is_cloud_lock = asyncio.Lock()
+        self._http = httpx.AsyncClient(
+            base_url=self.server,
+            auth=(email, api_token),
+            headers={"Accept": "application/json"},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.governor.max_concurrency,
+                max_keepalive_connections=self.governor.max_concurrency,
+            ),
+            transport=transport,
+        )
+
+    @classmethod
+    def from_config(cls, credentials, jira_config=None):
+        jira_config = jira_config or Config("config/config.yaml").get("jira")
+        jira_email, api_token = credentials.get_jira_credentials()
+        if not jira_email or not api_token:
+            raise ConnectionError("Jira credentials not found in environment variables or config.yaml")
+        return cls(
+            # api_base_url lets the async client target a proxy or a local stub server.
+            jira_config.get("api_base_url") or jira_config["server"],
+            jira_email,
+            api_token,
+            # Keyed by the real server so async and blocking clients share one budget.
+            governor=get_governor(jira_config["server"], jira_config.get("rate_limit")),
+            page_size=int(jira_config.get("search_page_size", DEFAULT_SEARCH_PAGE_SIZE)),
+            epic_link_cache=get_epic_link_cache(jira_config.get("epic_link_cache")),
+        )
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def _request_json(self, method, path, **kwargs):
+        for attempt in range(self.governor.max_retries + 1):
+            started_at = await self.governor.acquire_async()
+            try:
+                response = await self._http.request(method, path, **kwargs)
+            except Exception:
+                self.governor.release(started_at)
+                raise
+            if response.status_code not in THROTTLE_STATUSES:
+                self.governor.release(started_at, response.status_code)
+                break
+            pause = throttle_pause(response.headers.get("Retry-After"), attempt)
+            self.governor.release(started_at, response.status_code, pause)
+            if attempt < self.governor.max_retries:
+                logger.warning(
+                    f"Jira throttled {method} {path} ({response.status_code}); "
+                    f"retrying in {pause:.1f}s ({attempt + 1}/{self.governor.max_retries})"
+                )
+        response.raise_for_status()
+        return response.json()
+
+    async def is_cloud(self):
+        if self._is_cloud is None:
+            # Concurrent first calls wait for one serverInfo probe.
+            async with self._is_cloud_lock:
+                if self._is_cloud is None:
+                    server_info = await self._request_json("GET", "/rest/api/2/serverInfo")
+                    self._is_cloud = server_info.get("deploymentType") == "Cloud"
+        return self._is_cloud
+
+    async def _search_page(self, jql, fields, expand=None, start_at=0, max_results=None, next_page_token=None):
+        if await self.is_cloud():
+            body = {"jql": jql, "fields": fields, "maxResults": max_results or self.page_size}
+            if expand:
+                body["expand"] = expand
+            if next_page_token:
+                body["nextPageToken"] = next_page_token
+            return await self._request_json("POST", "/rest/api/2/search/jql", json=body)
+        body = {"jql": jql, "fields": fields, "startAt": start_at, "maxResults": max_results or self.page_size,
+                "validateQuery": False}
+        if expand:
+            body["expand"] = [expand]
+        return await self._request_json("POST", "/rest/api/2/search", json=body)
+
+    async def _search_records_page(self, jql, fields, expand, extra_fields, start_at=0, max_results=None):
+        # Convert each page as it arrives so its JSON can be released right away.
+        page = await self._search_page(jql, fields, expand, start_at=start_at, max_results=max_results)
+        records = records_from_raw(page.get("issues", []), extra_fields)
+        total = page.get("total") or 0
+        if await self.is_cloud():
+            # Cloud returns fewer issues than asked for when it caps the page
+            # (it does with changelogs expanded); follow the token to the end.
+            while not page.get("isLast", True) and page.get("nextPageToken"):
+                page = await self._search_page(jql, fields, expand, max_results=max_results, next_page_token=page["nextPageToken"])
+                records.extend(records_from_raw(page.get("issues", []), extra_fields))
+        return records, total
+
+    async def search_records(self, jql, extra_fields=(), expand="changelog", raise_errors=False) -> List[IssueRecord]:
+        fields = REPORT_FIELDS + [f for f in extra_fields if f not in REPORT_FIELDS]
+        try:
+            if await self.is_cloud():
+                return await self._search_by_key_windows(jql, fields, expand, extra_fields)
+            return await self._search_by_start_at(jql, fields, expand, extra_fields)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error executing JQL: {jql}\n{e}")
+            return []
+
+    async def _search_by_start_at(self, jql, fields, expand, extra_fields):
+        records, total = await self._search_records_page(jql, fields, expand, extra_fields)
+        page_size = len(records) or self.page_size
+        windows = range(len(records), total, page_size)
+        logger.debug(f"Search returned {total} issues; fetching {len(windows)} more pages of {page_size}")
+        pages = await asyncio.gather(
+            *(self._search_records_page(jql, fields, expand, extra_fields, start_at=start_at, max_results=page_size)
+              for start_at in windows)
+        )
+        for page_records, _ in pages:
+            records.extend(page_records)
+        return records
+
+    async def _list_issue_keys(self, jql):
+        # Token paging is inherently sequential, but a key-only listing is cheap.
+        keys = []
+        params = {"jql": jql, "fields": "key", "maxResults": KEY_LISTING_PAGE_SIZE}
+        while True:
+            page = await self._request_json("GET", "/rest/api/2/search/jql", params=params)
+            keys.extend(issue["key"] for issue in page.get("issues", []))
+            if page.get("isLast", True) or not page.get("nextPageToken"):
+                return keys
+            params["nextPageToken"] = page["nextPageToken"]
+
+    async def _search_by_key_windows(self, jql, fields, expand, extra_fields):
+        keys = await self._list_issue_keys(jql)
+        windows = [keys[i:i + self.page_size] for i in range(0, len(keys), self.page_size)]
+        logger.debug(f"Search returned {len(keys)} issues; fetching {len(windows)} pages of {self.page_size}")
+        pages = await asyncio.gather(
+            *(self._search_records_page(f"key in ({', '.join(window)})", fields, expand, extra_fields, max_results=len(window))
+              for window in windows)
+        )
+        records_by_key = {record.key: record for page_records, _ in pages for record in page_records}
+        return [records_by_key[key] for key in keys if key in records_by_key]
+
+    async def fetch_record_changelogs(self, records: List[IssueRecord]):
+        if not records:
+            return records
+        keys = [record.key for record in records]
+        windows = [keys[i:i + self.page_size] for i in range(0, len(keys), self.page_size)]
+        logger.debug(f"Fetching changelogs for {len(keys)} issues in {len(windows)} windows")
+        pages = await asyncio.gather(
+            *(self._search_records_page(f"key in ({', '.join(window)})", ["key"], "changelog", (), max_results=len(window))
+              for window in windows)
+        )
+        changelogs = {fetched.key: fetched for page_records, _ in pages for fetched in page_records}
+        for record in records:
+            fetched = changelogs.get(record.key)
+            if fetched is None:
+                logger.warning(f"No changelog returned for {record.key}")
+                record.histories, record.changelog_complete = [], True
+            else:
+                record.histories, record.changelog_complete = fetched.histories, fetched.changelog_complete
+        return await self.complete_record_changelogs(records)
+
+    async def _fetch_full_histories(self, record):
+        if await self.is_cloud():
+            path = f"/rest/api/2/issue/{record.key}/changelog"
+            first_page = await self._request_json("GET", path, params={"startAt": 0, "maxResults": CHANGELOG_PAGE_SIZE})
+            values = first_page.get("values", [])
+            pages = await asyncio.gather(
+                *(self._request_json("GET", path, params={"startAt": start_at, "maxResults": CHANGELOG_PAGE_SIZE})
+                  for start_at in range(len(values), first_page.get("total") or 0, len(values) or CHANGELOG_PAGE_SIZE))
+            )
+            histories = compact_histories(values)
+            for page in pages:
+                histories.extend(compact_histories(page.get("values", [])))
+            return histories
+        # Server/Data Center returns the whole changelog on a single issue read.
+        raw = await self._request_json("GET", f"/rest/api/2/issue/{record.key}",
+                                       params={"fields": "key", "expand": "changelog"})
+        return compact_histories((raw.get("changelog") or {}).get("histories", []))
+
+    async def complete_record_changelogs(self, records: List[IssueRecord]):
+        truncated = [record for record in records if not record.changelog_complete]
+        if not truncated:
+            return records
+        logger.info(f"Fetching full changelog for {len(truncated)} issues with truncated history")
+        for record, histories in zip(truncated, await asyncio.gather(*(self._fetch_full_histories(r) for r in truncated))):
+            record.histories = histories
+            record.changelog_complete = True
+        return records
+
+    async def _fetch_parent_batch(self, batch):
+        try:
+            parents, _ = await self._search_records_page(
+                f"key in ({', '.join(batch)})", [EPIC_LINK_FIELD], None, (), max_results=len(batch)
+            )
+        except Exception as e:
+            logger.warning(f"Could not fetch parent issues {batch}: {e}")
+            return {}
+        fetched = {parent.key: parent.epic_link for parent in parents}
+        # Parents that exist but were not returned have no readable epic link.
+        for key in batch:
+            fetched.setdefault(key, None)
+        return fetched
+
+    async def resolve_parent_epics(self, parent_keys):
+        parent_keys = set(parent_keys)
+        epic_links = self.epic_link_cache.get_many(parent_keys) if self.epic_link_cache else {}
+        missing_keys = sorted(parent_keys - epic_links.keys())
+        if not missing_keys:
+            return epic_links
+
+        logger.info(f"Resolving epic links for {len(missing_keys)} parent issues ({len(epic_links)} cached)")
+        batches = [missing_keys[i:i + PARENT_LOOKUP_BATCH_SIZE] for i in range(0, len(missing_keys), PARENT_LOOKUP_BATCH_SIZE)]
+        fetched = {}
+        for batch_links in await asyncio.gather(*(self._fetch_parent_batch(batch) for batch in batches)):
+            fetched.update(batch_links)
+
+        if self.epic_link_cache:
+            # put_many rewrites the cache file; keep that off the event loop.
+            await asyncio.to_thread(self.epic_link_cache.put_many, fetched)
+        epic_links.update(fetched)
+        return epic_links
@@ -0,0 +1,132 @@
+from bisect import bisect_left
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+MINUTE = timedelta(minutes=1)
+MINUTES_PER_DAY = 24 * 60
+MINUTE_US = 60_000_000
+
+
+class BusinessCalendar:
+    """Closed-form business time arithmetic (Monday-Friday, minus holidays).
+
+    Results match the minute-by-minute walk this replaces: a minute counts
+    when the tick starting it falls on a business day in the start date's
+    wall clock.
+    """
+
+    def __init__(self, holidays=None):
+        self.holidays = frozenset(holidays or ())
+        # Only weekday holidays change a business-day count.
+        self._weekday_holidays = sorted(h for h in self.holidays if h.weekday() < 5)
+        self._np_calendar = np.busdaycalendar(holidays=sorted(self.holidays))
+
+    def is_business_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _weekdays_between(self, first: date, last: date) -> int:
+        # Weekdays in the half-open range [first, last).
+        days = (last - first).days
+        if days <= 0:
+            return 0
+        full_weeks, remainder = divmod(days, 7)
+        start_weekday = first.weekday()
+        extra = sum(1 for offset in range(remainder) if (start_weekday + offset) % 7 < 5)
+        return full_weeks * 5 + extra
+
+    def _holidays_between(self, first: date, last: date) -> int:
+        return bisect_left(self._weekday_holidays, last) - bisect_left(self._weekday_holidays, first)
+
+    def business_days_between(self, first: date, last: date) -> int:
+        # Business days in the half-open range [first, last).
+        if last <= first:
+            return 0
+        return self._weekdays_between(first, last) - self._holidays_between(first, last)
+
+    def business_minutes(self, start_date: datetime, end_date: datetime) -> int:
+        elapsed_us = (end_date - start_date) // timedelta(microseconds=1)
+        if elapsed_us <= 0:
+            return 0
+        # Number of one-minute ticks start, start+1m, ... that are < end_date.
+        ticks = -(-elapsed_us // MINUTE_US)
+
+        local_start = start_date.replace(tzinfo=None)
+        first_day = local_start.date()
+        last_day = (local_start + (ticks - 1) * MINUTE).date()
+
+        if first_day == last_day:
+            return ticks if self.is_business_day(first_day) else 0
+
+        def ticks_before(moment):
+            offset_us = (moment - local_start) // timedelta(microseconds=1)
+            return -(-offset_us // MINUTE_US)
+
+        total = 0
+        first_day_ticks = ticks_before(datetime.combine(first_day + timedelta(days=1), datetime.min.time()))
+        if self.is_business_day(first_day):
+            total += first_day_ticks
+        if self.is_business_day(last_day):
+            total += ticks - ticks_before(datetime.combine(last_day, datetime.min.time()))
+        total += MINUTES_PER_DAY * self.business_days_between(first_day + timedelta(days=1), last_day)
+        return total
+
+    def business_hours(self, start_date: datetime, end_date: datetime) -> float:
+        return self.business_minutes(start_date, end_date) / 60
+
+    def business_minutes_array(self, local_starts, elapsed_us):
+        # local_starts: datetime64[us] wall-clock starts; elapsed_us: int64 durations.
+        local_starts = np.asarray(local_starts, dtype="datetime64[us]")
+        elapsed_us = np.asarray(elapsed_us, dtype=np.int64)
+        ticks = np.where(elapsed_us > 0, -(-elapsed_us // MINUTE_US), 0)
+
+        first_day = local_starts.astype("datetime64[D]")
+        last_day = (local_starts + (ticks - 1) * np.timedelta64(1, "m")).astype("datetime64[D]")
+        next_day = first_day + np.timedelta64(1, "D")
+
+        def ticks_before(days):
+            offset_us = (days.astype("datetime64[us]") - local_starts).astype(np.int64)
+            return -(-offset_us // MINUTE_US)
+
+        first_is_business = np.is_busday(first_day, busdaycal=self._np_calendar)
+        last_is_business = np.is_busday(last_day, busdaycal=self._np_calendar)
+        same_day = first_day == last_day
+        whole_days = np.busday_count(next_day, np.maximum(last_day, next_day), busdaycal=self._np_calendar)
+
+        spanning = (
+            ticks_before(next_day) * first_is_business
+            + (ticks - ticks_before(last_day)) * last_is_business
+            + MINUTES_PER_DAY * whole_days
+        )
+        minutes = np.where(same_day, ticks * first_is_business, spanning)
+        return np.where(ticks > 0, minutes, 0)
+
+    def business_hours_batch(self, intervals):
+        # intervals: iterable of (start_date, end_date) pairs; returns a float64 array of hours.
+        local_starts = []
+        elapsed_us = []
+        for start_date, end_date in intervals:
+            local_starts.append(start_date.replace(tzinfo=None))
+            elapsed_us.append((end_date - start_date) // timedelta(microseconds=1))
+        if not local_starts:
+            return np.zeros(0)
+        minutes = self.business_minutes_array(
+            np.array(local_starts, dtype="datetime64[us]"), np.array(elapsed_us, dtype=np.int64)
+        )
+        return minutes / 60
+
+    def business_days(self, start_date: datetime, end_date: datetime) -> int:
+        # Inclusive of both calendar dates, as in calculate_business_days.
+        return self.business_days_between(start_date.date(), end_date.date() + timedelta(days=1))
+
+
+@lru_cache(maxsize=32)
+def _calendar_for_holidays(holidays: frozenset) -> BusinessCalendar:
+    return BusinessCalendar(holidays)
+
+
+def get_calendar(holidays) -> BusinessCalendar:
+    if isinstance(holidays, BusinessCalendar):
+        return holidays
+    return _calendar_for_holidays(frozenset(holidays or ()))
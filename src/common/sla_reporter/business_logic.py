@@ -3,6 +3,8 @@ from datetime import datetime, date
 from typing import List
 
 from .config import Config, load_release_config, get_release_info
+from .changelog_analyzer import parse_jira_datetime
+from .issue_records import record_timeline
 from .jira_client import SlaJiraClient
 from .report_generator import (
     generate_all_issues_report,
@@ -100,31 +102,33 @@ class BusinessLogic:
         logger.debug(f"Generated HTML report (first 500 chars): {html_report[:500]}")
         return html_report
 
+    def _issue_details(self, records) -> List[IssueDetails]:
+        self.jira_client.complete_record_changelogs(records)
+        metrics = self.jira_client.get_sla_metrics_batch([record_timeline(record) for record in records])
+        return [
+            IssueDetails(
+                key=record.key,
+                summary=record.summary,
+                assignee=record.assignee if record.assignee is not None else 'Unassigned',
+                assignee_email=record.assignee_email,
+                reporter=record.reporter if record.reporter is not None else 'N/A',
+                reporter_email=record.reporter_email,
+                priority=record.priority,
+                status=record.status,
+                time_in_status=sla_metrics.time_in_status,
+                time_to_assign=sla_metrics.time_to_assign,
+                time_in_each_status=sla_metrics.time_in_each_status,
+                created=parse_jira_datetime(record.created),
+                resolution_date=parse_jira_datetime(record.resolution_date) if record.resolution_date else None,
+            )
+            for record, sla_metrics in zip(records, metrics)
+        ]
+
     def _fetch_report_data(self, report_config, release_version) -> ReportData:
         logger.info(f"Fetching issues for report: {report_config['name']}")
         jql = report_config["jql_template"].format(fix_version=release_version)
         logger.debug(f"JQL: {jql}")
-        issues = self.jira_client.search_issues(jql)
-
-        issue_details = []
-        for issue in issues:
-            issue_details.append(
-                IssueDetails(
-                    key=issue.key,
-                    summary=issue.fields.summary,
-                    assignee=issue.fields.assignee.displayName if issue.fields.assignee else 'Unassigned',
-                    assignee_email=issue.fields.assignee.emailAddress if issue.fields.assignee else '',
-                    reporter=issue.fields.reporter.displayName if issue.fields.reporter else 'N/A',
-                    reporter_email=issue.fields.reporter.emailAddress if issue.fields.reporter else '',
-                    priority=issue.fields.priority.name,
-                    status=issue.fields.status.name,
-                    time_in_status=self.jira_client.get_time_in_current_status(issue),
-                    time_to_assign=self.jira_client.get_time_to_assign(issue),
-                    time_in_each_status=self.jira_client.get_time_in_each_status(issue),
-                    created=datetime.strptime(issue.fields.created, "%Y-%m-%dT%H:%M:%S.%f%z"),
-                    resolution_date=datetime.strptime(issue.fields.resolutiondate, "%Y-%m-%dT%H:%M:%S.%f%z") if issue.fields.resolutiondate else None,
-                )
-            )
+        issue_details = self._issue_details(self.jira_client.search_records(jql))
 
         return ReportData(
             name=report_config["name"],
@@ -141,27 +145,7 @@ class BusinessLogic:
             fix_version=release_version, release_date=release_date
         )
         logger.debug(f"JQL: {jql}")
-        issues = self.jira_client.search_issues(jql)
-
-        issue_details = []
-        for issue in issues:
-            issue_details.append(
-                IssueDetails(
-                    key=issue.key,
-                    summary=issue.fields.summary,
-                    assignee=issue.fields.assignee.displayName if issue.fields.assignee else 'Unassigned',
-                    assignee_email=issue.fields.assignee.emailAddress if issue.fields.assignee else '',
-                    reporter=issue.fields.reporter.displayName if issue.fields.reporter else 'N/A',
-                    reporter_email=issue.fields.reporter.emailAddress if issue.fields.reporter else '',
-                    priority=issue.fields.priority.name,
-                    status=issue.fields.status.name,
-                    time_in_status=self.jira_client.get_time_in_current_status(issue),
-                    time_to_assign=self.jira_client.get_time_to_assign(issue),
-                    time_in_each_status=self.jira_client.get_time_in_each_status(issue),
-                    created=datetime.strptime(issue.fields.created, "%Y-%m-%dT%H:%M:%S.%f%z"),
-                    resolution_date=datetime.strptime(issue.fields.resolutiondate, "%Y-%m-%dT%H:%M:%S.%f%z") if issue.fields.resolutiondate else None,
-                )
-            )
+        issue_details = self._issue_details(self.jira_client.search_records(jql))
 
         return ReportData(
             name=report_config["name"],
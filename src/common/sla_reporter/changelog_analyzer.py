@@ -0,0 +1,116 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+JIRA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+# Statuses whose time-in-current-status is measured up to the resolution date.
+CLOSED_STATUSES = frozenset({"Ready for Release", "Ready for Showcase", "Closed", "Done", "Canceled"})
+
+
+def parse_jira_datetime(value: str) -> datetime:
+    return datetime.strptime(value, JIRA_DATETIME_FORMAT)
+
+
+@dataclass
+class IssueTimeline:
+    key: str
+    status: str
+    created: datetime
+    resolution_date: Optional[datetime]
+    assigned: bool
+    current_status_start: datetime
+    first_assigned: Optional[datetime]
+    # (timestamp, from status, to status), ordered by timestamp.
+    status_transitions: List[Tuple[datetime, str, str]] = field(default_factory=list)
+
+    def current_status_interval(self, now: datetime) -> Tuple[datetime, datetime]:
+        if self.status in CLOSED_STATUSES and self.resolution_date:
+            return self.created, self.resolution_date
+        return self.current_status_start, now
+
+    def assignment_interval(self) -> Optional[Tuple[datetime, datetime]]:
+        if self.first_assigned:
+            return self.created, self.first_assigned
+        return None
+
+    def unassigned_time_to_assign(self):
+        # No transition from unassigned to assigned: 0 if assigned at creation, None if never assigned.
+        return 0 if self.assigned else None
+
+    def status_intervals(self, now: datetime) -> List[Tuple[str, datetime, datetime]]:
+        current_status = self.status
+        last_change_timestamp = self.created
+        if self.status_transitions:
+            current_status = self.status_transitions[0][1]  # The status before the first change
+
+        intervals = []
+        for transition_time, status_from, status_to in self.status_transitions:
+            intervals.append((status_from, last_change_timestamp, transition_time))
+            current_status = status_to
+            last_change_timestamp = transition_time
+        intervals.append((current_status, last_change_timestamp, now))
+        return intervals
+
+
+def build_timeline(key, created, status, resolution_date, assigned, histories: Iterable) -> IssueTimeline:
+    """Walk a changelog once, in order.
+
+    ``histories`` yields ``(created, items)`` pairs where each item is a
+    ``(field, fromString, toString)`` tuple.
+    """
+    created_date = parse_jira_datetime(created)
+    first_assigned = None
+    last_status_change = None
+    status_transitions = []
+    needs_sort = False
+
+    for history_created, items in histories:
+        history_date = None
+        for item_field, from_value, to_value in items:
+            if item_field == "status":
+                if history_date is None:
+                    history_date = parse_jira_datetime(history_created)
+                if status_transitions and history_date < status_transitions[-1][0]:
+                    needs_sort = True
+                status_transitions.append((history_date, from_value, to_value))
+                last_status_change = history_date
+            elif item_field == "assignee" and first_assigned is None:
+                # Transition from unassigned (None or empty string) to assigned
+                if not from_value and to_value:
+                    if history_date is None:
+                        history_date = parse_jira_datetime(history_created)
+                    first_assigned = history_date
+
+    if needs_sort:
+        status_transitions.sort(key=lambda transition: transition[0])
+
+    return IssueTimeline(
+        key=key,
+        status=status,
+        created=created_date,
+        resolution_date=parse_jira_datetime(resolution_date) if resolution_date else None,
+        assigned=assigned,
+        current_status_start=last_status_change or created_date,
+        first_assigned=first_assigned,
+        status_transitions=status_transitions,
+    )
+
+
+def _resource_histories(issue):
+    for history in issue.changelog.histories:
+        yield history.created, (
+            (item.field, getattr(item, "fromString", None), getattr(item, "toString", None))
+            for item in history.items
+        )
+
+
+def analyze_issue(issue) -> IssueTimeline:
+    return build_timeline(
+        issue.key,
+        issue.fields.created,
+        issue.fields.status.name,
+        issue.fields.resolutiondate,
+        bool(getattr(issue.fields, "assignee", None)),
+        _resource_histories(issue),
+    )
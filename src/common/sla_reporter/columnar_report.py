@@ -0,0 +1,233 @@
+import sys
+from datetime import timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .models import SlaMetrics, IssueRecord
+from .changelog_analyzer import IssueTimeline
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _encode(values):
+    # Dictionary-encode repeated strings: int32 codes into one list of interned labels.
+    index = {}
+    labels = []
+    codes = np.empty(len(values), dtype=np.int32)
+    for position, value in enumerate(values):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(labels)
+            labels.append(_intern(value))
+        codes[position] = code
+    return codes, labels
+
+
+def _to_datetime64(value):
+    if value is None:
+        return np.datetime64("NaT", "us")
+    return np.datetime64(value.astimezone(timezone.utc).replace(tzinfo=None), "us")
+
+
+def _to_datetime(value):
+    if np.isnat(value):
+        return None
+    return value.astype("datetime64[us]").item().replace(tzinfo=timezone.utc)
+
+
+class IssueTable:
+    """Column store for the issues of one fetch, shared by every report section cut from it.
+
+    Strings that repeat across issues (status, priority, team, people) are
+    interned and stored as int32 codes. Time spent in each status is a dense
+    float matrix with one row per status and one column per issue. NaN marks
+    a status the issue never entered.
+    """
+
+    def __init__(self, keys, summaries, people, categories, time_in_status, time_to_assign,
+                 created, resolution_date, statuses, status_hours):
+        self.keys = keys
+        self.summaries = summaries
+        # name -> (codes, labels) for assignee, assignee_email, reporter, reporter_email.
+        self.people = people
+        # name -> (codes, labels) for priority, status, team.
+        self.categories = categories
+        self.time_in_status = time_in_status
+        self.time_to_assign = time_to_assign
+        self.created = created
+        self.resolution_date = resolution_date
+        self.statuses = statuses
+        self.status_hours = status_hours
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_records(cls, records: List[IssueRecord], teams: List[str], timelines: List[IssueTimeline],
+                     metrics: List[SlaMetrics]):
+        status_index = {}
+        for sla_metrics in metrics:
+            for status in sla_metrics.time_in_each_status:
+                status_index.setdefault(status, len(status_index))
+        status_hours = np.full((len(status_index), len(records)), np.nan)
+        for column, sla_metrics in enumerate(metrics):
+            for status, hours in sla_metrics.time_in_each_status.items():
+                status_hours[status_index[status], column] = hours
+
+        return cls(
+            keys=[record.key for record in records],
+            summaries=[record.summary for record in records],
+            people={
+                "assignee": _encode([r.assignee if r.assignee is not None else "Unassigned" for r in records]),
+                "assignee_email": _encode([r.assignee_email for r in records]),
+                "reporter": _encode([r.reporter if r.reporter is not None else "N/A" for r in records]),
+                "reporter_email": _encode([r.reporter_email for r in records]),
+            },
+            categories={
+                "priority": _encode([record.priority for record in records]),
+                "status": _encode([record.status for record in records]),
+                "team": _encode(teams),
+            },
+            time_in_status=np.array([m.time_in_status for m in metrics], dtype=np.float64),
+            time_to_assign=np.array(
+                [np.nan if m.time_to_assign is None else m.time_to_assign for m in metrics], dtype=np.float64
+            ),
+            created=np.array([_to_datetime64(t.created) for t in timelines], dtype="datetime64[us]"),
+            resolution_date=np.array([_to_datetime64(t.resolution_date) for t in timelines], dtype="datetime64[us]"),
+            statuses=[_intern(status) for status in status_index],
+            status_hours=status_hours,
+        )
+
+    def _encoded(self, column):
+        return self.categories[column] if column in self.categories else self.people[column]
+
+    def label(self, column, position):
+        codes, labels = self._encoded(column)
+        return labels[codes[position]]
+
+    def labels_for(self, column, rows):
+        codes, labels = self._encoded(column)
+        if None in labels:
+            return [labels[code] for code in codes[rows].tolist()]
+        return pd.Categorical.from_codes(codes[rows], categories=labels)
+
+
+class IssueRow:
+    """Read-only view of one issue in an IssueTable, with the attributes of IssueDetails."""
+
+    __slots__ = ("_table", "_position")
+
+    def __init__(self, table: IssueTable, position: int):
+        self._table = table
+        self._position = position
+
+    key = property(lambda self: self._table.keys[self._position])
+    summary = property(lambda self: self._table.summaries[self._position])
+    assignee = property(lambda self: self._table.label("assignee", self._position))
+    assignee_email = property(lambda self: self._table.label("assignee_email", self._position))
+    reporter = property(lambda self: self._table.label("reporter", self._position))
+    reporter_email = property(lambda self: self._table.label("reporter_email", self._position))
+    priority = property(lambda self: self._table.label("priority", self._position))
+    status = property(lambda self: self._table.label("status", self._position))
+    team = property(lambda self: self._table.label("team", self._position))
+
+    @property
+    def time_in_status(self):
+        return float(self._table.time_in_status[self._position])
+
+    @property
+    def time_to_assign(self):
+        hours = self._table.time_to_assign[self._position]
+        return None if np.isnan(hours) else float(hours)
+
+    @property
+    def time_in_each_status(self) -> Dict[str, float]:
+        hours = self._table.status_hours[:, self._position]
+        return {status: float(h) for status, h in zip(self._table.statuses, hours) if not np.isnan(h)}
+
+    @property
+    def created(self):
+        return _to_datetime(self._table.created[self._position])
+
+    @property
+    def resolution_date(self):
+        return _to_datetime(self._table.resolution_date[self._position])
+
+    def __repr__(self):
+        return f"IssueRow(key={self.key!r}, status={self.status!r}, team={self.team!r})"
+
+
+class IssueRows(Sequence):
+    def __init__(self, table: IssueTable, rows: np.ndarray):
+        self._table = table
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return IssueRows(self._table, self._rows[index])
+        return IssueRow(self._table, int(self._rows[index]))
+
+    def __iter__(self):
+        table = self._table
+        for position in self._rows.tolist():
+            yield IssueRow(table, position)
+
+
+class ColumnarReportData:
+    """ReportData backed by an IssueTable.
+
+    ``issues`` iterates IssueRow views, so templates, the spreadsheet export
+    and the email BCC collection read it like a list of IssueDetails.
+    Whole-section aggregations work on the columns directly.
+    """
+
+    def __init__(self, name: str, jql: str, table: IssueTable, rows: Optional[Sequence[int]] = None):
+        self.name = name
+        self.jql = jql
+        self.table = table
+        self.rows = np.arange(len(table), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+
+    @property
+    def issues(self) -> IssueRows:
+        return IssueRows(self.table, self.rows)
+
+    def __repr__(self):
+        return f"ColumnarReportData(name={self.name!r}, issues={len(self.rows)})"
+
+    def column(self, name):
+        values = getattr(self.table, name)
+        return values[self.rows] if isinstance(values, np.ndarray) else [values[i] for i in self.rows.tolist()]
+
+    def to_frame(self) -> pd.DataFrame:
+        table = self.table
+        return pd.DataFrame({
+            "key": self.column("keys"),
+            "summary": self.column("summaries"),
+            **{name: table.labels_for(name, self.rows) for name in table.people},
+            **{name: table.labels_for(name, self.rows) for name in table.categories},
+            "time_in_status": table.time_in_status[self.rows],
+            "time_to_assign": table.time_to_assign[self.rows],
+            "created": pd.to_datetime(table.created[self.rows], utc=True),
+            "resolution_date": pd.to_datetime(table.resolution_date[self.rows], utc=True),
+        })
+
+    def status_hours_frame(self) -> pd.DataFrame:
+        # One row per issue, one column per status; NaN where the issue never had that status.
+        return pd.DataFrame(
+            self.table.status_hours[:, self.rows].T, columns=self.table.statuses, index=self.column("keys")
+        )
+
+    def sla_hours(self, sla_config, default_sla=48) -> np.ndarray:
+        codes, labels = self.table.categories["priority"]
+        per_label = np.array([float(sla_config.get(label, default_sla)) for label in labels] or [default_sla])
+        return per_label[codes[self.rows]]
+
+    def breached(self, sla_config, default_sla=48) -> np.ndarray:
+        return self.table.time_in_status[self.rows] > self.sla_hours(sla_config, default_sla)
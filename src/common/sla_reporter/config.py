@@ -1,8 +1,76 @@
+import os
+import threading
 import yaml
 from pathlib import Path
 from .models import ReleaseInfo, TeamInfo
 from typing import List, Dict
 
+from .logger import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+
+
+class FrozenDict(dict):
+    """A dict that refuses changes, so one parsed config can be shared by every thread."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Configuration snapshots are read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _FileRegistry:
+    """Values derived from files, rebuilt only when a file's mtime or size changes.
+
+    Every lookup costs one stat() call; the file is read and parsed again
+    only after it has been edited.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, load):
+        signature = _file_signature(path)
+        entry = self._entries.get((path, load))
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get((path, load))
+            if entry is None or entry[0] != signature:
+                entry = self._entries[(path, load)] = (signature, load(path))
+                logger.debug(f"Loaded {path}")
+            return entry[1]
+
+
+_registry = _FileRegistry()
+
+
+def _parse_yaml(path):
+    with open(path, "r") as f:
+        return _freeze(yaml.safe_load(f) or {})
+
+
+def config_snapshot(config_path):
+    """The parsed YAML file at config_path (relative to the project root) as a read-only snapshot."""
+    return _registry.get(PROJECT_ROOT / config_path, _parse_yaml)
+
 
 class Config:
     def __init__(self, config_path="config/regression_config.yaml"):
@@ -10,23 +78,21 @@ class Config:
         self.data = self._load_config()
 
     def _load_config(self):
-        project_root = Path(__file__).parent.parent.parent.parent
-        absolute_config_path = project_root / self.config_path
-        with open(absolute_config_path, "r") as f:
-            return yaml.safe_load(f)
+        return config_snapshot(self.config_path)
 
     def get(self, key, default=None):
         return self.data.get(key, default)
 
 
+def _parse_release_config(path):
+    data = _parse_yaml(path)
+    teams = FrozenDict((team["name"], TeamInfo(**team)) for team in data.get("teams", ()))
+    releases = data.get("releases", ())
+    return releases, teams
+
+
 def load_release_config(config_path="config/release-config.yaml") -> Dict[str, TeamInfo]:
-    project_root = Path(__file__).parent.parent.parent.parent
-    absolute_config_path = project_root / config_path
-    with open(absolute_config_path, "r") as f:
-        data = yaml.safe_load(f)
-        teams = {team["name"]: TeamInfo(**team) for team in data.get("teams", [])}
-        releases = data.get("releases", [])
-        return releases, teams
+    return _registry.get(PROJECT_ROOT / config_path, _parse_release_config)
 
 
 def get_release_info(releases: List[Dict], teams: Dict[str, TeamInfo], release_version: str) -> ReleaseInfo:
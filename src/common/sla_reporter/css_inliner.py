@@ -0,0 +1,314 @@
+import copy
+import operator
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import cssselect
+import cssutils
+import premailer
+from lxml import etree
+from premailer import Premailer
+from premailer.premailer import get_or_create_head
+
+from .logger import logger
+
+# CssInliner drives Premailer internals, checked against the version pinned in
+# requirements.txt; any other release without them inlines with premailer.transform.
+try:
+    from premailer.merge_style import csstext_to_pairs, merge_styles
+    from premailer.premailer import FILTER_PSEUDOSELECTORS, _create_cssselector
+    PREMAILER_INTERNALS = all(
+        hasattr(Premailer, name) for name in ("_process_css_text", "_style_to_basic_html_attributes")
+    )
+except ImportError:
+    PREMAILER_INTERNALS = False
+
+EMAIL_CSS_PATH = Path(__file__).parent.parent.parent / "webapp" / "frontend" / "src" / "index.css"
+COMPACT_EMAIL_CSS_PATH = Path(__file__).parent / "templates" / "email_compact.css"
+
+_STYLESHEETS = "style,link[rel~=stylesheet]"
+_LINE_BREAK_WHITESPACE = re.compile(r"\s*\n\s*")
+# Documents full of distinct ids could otherwise grow the signature cache without bound.
+MAX_CACHED_SIGNATURES = 50000
+
+
+class UnsupportedSelector(ValueError):
+    pass
+
+
+class _Node:
+    # Everything a supported selector can test about an element. Elements
+    # with equal nodes match exactly the same rules.
+    __slots__ = ("tag", "id", "classes", "parent", "first", "last", "rules")
+
+    def __init__(self, tag, element_id, class_attr, parent, first, last):
+        self.tag = tag
+        self.id = element_id
+        self.classes = frozenset(class_attr.split()) if class_attr else frozenset()
+        self.parent = parent
+        self.first = first
+        self.last = last
+        self.rules = None
+
+
+def _ancestors(node):
+    node = node.parent
+    while node is not None:
+        yield node
+        node = node.parent
+
+
+def _compile_selector(tree):
+    """Compile a parsed cssselect tree into a predicate over _Node."""
+    if isinstance(tree, cssselect.parser.Element):
+        tag = tree.element.lower() if tree.element else None
+        return lambda node: tag is None or node.tag == tag
+    if isinstance(tree, cssselect.parser.Class):
+        match, class_name = _compile_selector(tree.selector), tree.class_name
+        return lambda node: class_name in node.classes and match(node)
+    if isinstance(tree, cssselect.parser.Hash):
+        match, element_id = _compile_selector(tree.selector), tree.id
+        return lambda node: node.id == element_id and match(node)
+    if isinstance(tree, cssselect.parser.Pseudo) and tree.ident in ("first-child", "last-child"):
+        match, attribute = _compile_selector(tree.selector), tree.ident.split("-")[0]
+        return lambda node: getattr(node, attribute) and match(node)
+    if isinstance(tree, cssselect.parser.CombinedSelector) and tree.combinator in (" ", ">"):
+        ancestor, match = _compile_selector(tree.selector), _compile_selector(tree.subselector)
+        if tree.combinator == ">":
+            return lambda node: match(node) and node.parent is not None and ancestor(node.parent)
+        return lambda node: match(node) and any(ancestor(a) for a in _ancestors(node))
+    raise UnsupportedSelector(repr(tree))
+
+
+def _previous_element(element):
+    previous = element.getprevious()
+    while previous is not None and not isinstance(previous.tag, str):
+        previous = previous.getprevious()
+    return previous
+
+
+def _next_element(element):
+    following = element.getnext()
+    while following is not None and not isinstance(following.tag, str):
+        following = following.getnext()
+    return following
+
+
+class CssInliner:
+    """Inlines one stylesheet into HTML with the same output as Premailer.
+
+    The stylesheet is parsed, sorted by specificity and its selectors
+    compiled once. Per document there is one lxml parse, one walk of the
+    tree and one serialization. During the walk each element is reduced to
+    a structural signature (tag, id, classes, parent signature, first/last
+    child). Matching rules are computed once per distinct signature and the
+    merged style once per combination of inline style and rules, so a
+    report's thousands of identical rows cost a dictionary lookup each.
+
+    Stylesheets using selectors beyond tags, classes, ids, descendant/child
+    combinators and :first-child/:last-child are matched the way Premailer
+    does it, one document query per selector.
+    """
+
+    def __init__(self, css_text):
+        self.css_text = css_text
+        # Premailer's own rule parsing, with the options _send_email_report has always used.
+        self._premailer = Premailer(css_text=css_text, keep_style_tags=False, remove_classes=False)
+        rules = []
+        head = etree.Element("head")
+        self._premailer._process_css_text(css_text, 0, rules, head)
+        rules.sort(key=operator.itemgetter(0))
+        self._leftover_style = head[0] if len(head) else None
+
+        self._rules = []
+        for _, selector, style in rules:
+            new_selector, pseudo_class = selector, ""
+            if ":" in selector:
+                new_selector, pseudo_class = selector.split(":", 1)
+                pseudo_class = ":%s" % pseudo_class
+            # Filter-type pseudo selectors stay in the selector; other pseudo classes are matched without it.
+            if pseudo_class in FILTER_PSEUDOSELECTORS or pseudo_class.startswith(":nth-child"):
+                pseudo_class = ""
+            else:
+                selector = new_selector
+            self._rules.append((selector, style, pseudo_class))
+
+        try:
+            self._matchers = [_compile_selector(cssselect.parse(selector)[0].parsed_tree) for selector, _, _ in self._rules]
+            self._positional = any(":" in selector for selector, _, _ in self._rules)
+        except (UnsupportedSelector, cssselect.SelectorError) as e:
+            logger.debug(f"Inlining with one query per selector; unsupported selector: {e}")
+            self._matchers = None
+
+        self._nodes = {}
+        self._styles = {}
+        self._lock = threading.Lock()
+
+    def _node(self, element, parent, first, last):
+        key = (element.tag, element.get("id"), element.get("class"), parent, first, last)
+        node = self._nodes.get(key)
+        if node is None:
+            node = _Node(element.tag, key[1], key[2], parent, first, last)
+            node.rules = tuple(index for index, matches in enumerate(self._matchers) if matches(node))
+            with self._lock:
+                if len(self._nodes) >= MAX_CACHED_SIGNATURES:
+                    self._nodes.clear()
+                node = self._nodes.setdefault(key, node)
+        return node
+
+    def _merged_style(self, inline_style, rule_indices):
+        key = (inline_style, rule_indices)
+        merged = self._styles.get(key)
+        if merged is None:
+            final_style = merge_styles(
+                inline_style,
+                [csstext_to_pairs(self._rules[i][1], validate=True) for i in rule_indices],
+                [self._rules[i][2] for i in rule_indices],
+                remove_unset_properties=True,
+            )
+            scratch = etree.Element("scratch")
+            self._premailer._style_to_basic_html_attributes(scratch, final_style, force=True)
+            merged = (final_style, tuple(scratch.attrib.items()))
+            with self._lock:
+                self._styles[key] = merged
+        return merged
+
+    def _apply(self, element, rule_indices):
+        final_style, attributes = self._merged_style(element.get("style", ""), rule_indices)
+        if final_style:
+            element.set("style", final_style)
+        for name, value in attributes:
+            element.set(name, value)
+
+    def _apply_by_signature(self, page):
+        nodes = {}
+        styles = self._styles
+        for element in page.iter(etree.Element):
+            parent = nodes.get(element.getparent())
+            if self._positional:
+                first = _previous_element(element) is None
+                last = _next_element(element) is None
+            else:
+                first = last = False
+            node = nodes[element] = self._node(element, parent, first, last)
+            if not node.rules:
+                continue
+            inline_style = element.get("style", "")
+            merged = styles.get((inline_style, node.rules)) or self._merged_style(inline_style, node.rules)
+            if merged[0]:
+                element.set("style", merged[0])
+            for name, value in merged[1]:
+                element.set(name, value)
+
+    def _apply_by_query(self, page):
+        matched = {}
+        for index, (selector, _, _) in enumerate(self._rules):
+            for element in _create_cssselector(selector)(page):
+                matched.setdefault(element, []).append(index)
+        for element, rule_indices in matched.items():
+            self._apply(element, tuple(rule_indices))
+
+    def transform(self, html):
+        stripped = html.strip()
+        tree = etree.fromstring(stripped, etree.HTMLParser()).getroottree()
+        page = tree.getroot()
+        root = tree if stripped.startswith(tree.docinfo.doctype) else page
+
+        if _create_cssselector(_STYLESHEETS)(page):
+            # Documents that bring their own stylesheets need Premailer's full processing.
+            return Premailer(html, css_text=self.css_text, keep_style_tags=False, remove_classes=False).transform()
+
+        head = get_or_create_head(tree)
+        if self._leftover_style is not None:
+            head.append(copy.deepcopy(self._leftover_style))
+
+        if self._matchers is not None:
+            self._apply_by_signature(page)
+        else:
+            self._apply_by_query(page)
+
+        # Outlook understands align on images, not CSS floats.
+        for image in page.xpath("//img[@style]"):
+            image_float = cssutils.parseStyle(image.attrib["style"]).float
+            if image_float in ("left", "right"):
+                image.attrib["align"] = image_float
+        return etree.tostring(root, method="html", pretty_print=True, encoding="utf-8").decode("utf-8")
+
+
+class PremailerInliner:
+    """Inlines one stylesheet with premailer.transform, document by document."""
+
+    def __init__(self, css_text):
+        self.css_text = css_text
+
+    def transform(self, html):
+        return premailer.transform(html, pretty_print=True, css_text=self.css_text, keep_style_tags=False, remove_classes=False)
+
+
+@lru_cache(maxsize=8)
+def get_css_inliner(css_text):
+    if not PREMAILER_INTERNALS:
+        logger.warning(f"Premailer {getattr(premailer, '__version__', '')} lacks the internals CssInliner uses; inlining with premailer.transform")
+        return PremailerInliner(css_text)
+    return CssInliner(css_text)
+
+
+def _important(style):
+    declarations = (declaration.strip() for declaration in style.split(";"))
+    return ";".join(
+        declaration if declaration.endswith("!important") else f"{declaration} !important"
+        for declaration in declarations if declaration
+    )
+
+
+def compact_html(html, css_text):
+    """Shrink an email body to one shared <style> block instead of inlined styles.
+
+    Every distinct style attribute is replaced by a short class (s0, s1, ...)
+    whose rule is written once, marked !important so it still wins the way
+    the inline style did. Whitespace runs spanning lines collapse to a single
+    newline, which keeps the body small and its lines short.
+    """
+    stripped = html.strip()
+    tree = etree.fromstring(stripped, etree.HTMLParser()).getroottree()
+    page = tree.getroot()
+    root = tree if stripped.startswith(tree.docinfo.doctype) else page
+
+    style_classes = {}
+    for element in page.iter(etree.Element):
+        style = element.attrib.pop("style", None)
+        if style and style.strip():
+            declarations = _important(style)
+            name = style_classes.setdefault(declarations, f"s{len(style_classes)}")
+            class_attr = element.get("class")
+            element.set("class", f"{class_attr} {name}" if class_attr else name)
+        if element.text:
+            element.text = _LINE_BREAK_WHITESPACE.sub("\n", element.text)
+        if element.tail:
+            element.tail = _LINE_BREAK_WHITESPACE.sub("\n", element.tail)
+
+    style = etree.SubElement(get_or_create_head(tree), "style")
+    style.text = "\n".join(
+        [css_text.strip()] + [f".{name}{{{declarations}}}" for declarations, name in style_classes.items()]
+    )
+    return etree.tostring(root, method="html", encoding="utf-8").decode("utf-8")
+
+
+_email_css = {}
+
+
+def read_email_css(path=EMAIL_CSS_PATH):
+    # Re-read only when the file changes; the text is also the inliner's cache key.
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return ""
+    cached = _email_css.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r") as f:
+            cached = _email_css[path] = (mtime, f.read())
+        logger.debug(f"Loaded email stylesheet from {path}")
+    return cached[1]
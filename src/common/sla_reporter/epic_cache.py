@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .logger import logger
+
+DEFAULT_CACHE_PATH = "reports/epic_link_cache.json"
+DEFAULT_TTL_HOURS = 24
+
+_MISSING = object()
+
+
+class EpicLinkCache:
+    """Parent issue key -> epic key, kept in memory and persisted to a JSON file.
+
+    Parents without an epic link are cached as ``None`` so they are not
+    looked up again until their entry expires.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_HOURS * 3600):
+        project_root = Path(__file__).parent.parent.parent.parent
+        self.path = project_root / path
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable epic link cache at {self.path}: {e}")
+            return
+        now = time.time()
+        self._entries = {
+            key: (epic_key, fetched_at)
+            for key, (epic_key, fetched_at) in entries.items()
+            if now - fetched_at < self.ttl_seconds
+        }
+        logger.debug(f"Loaded {len(self._entries)} epic links from {self.path}")
+
+    def get_many(self, parent_keys):
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in parent_keys:
+                epic_key, fetched_at = self._entries.get(key, (_MISSING, 0))
+                if epic_key is not _MISSING and now - fetched_at < self.ttl_seconds:
+                    found[key] = epic_key
+        return found
+
+    def put_many(self, epic_links):
+        if not epic_links:
+            return
+        now = time.time()
+        with self._lock:
+            for key, epic_key in epic_links.items():
+                self._entries[key] = (epic_key, now)
+            snapshot = dict(self._entries)
+        self._save(snapshot)
+
+    def _save(self, entries):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist epic link cache to {self.path}: {e}")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_epic_link_cache(cache_config=None) -> EpicLinkCache:
+    # One cache per file for the whole process, so it is shared across reports.
+    cache_config = cache_config or {}
+    path = cache_config.get("path", DEFAULT_CACHE_PATH)
+    ttl_seconds = float(cache_config.get("ttl_hours", DEFAULT_TTL_HOURS)) * 3600
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = EpicLinkCache(path, ttl_seconds)
+        return cache
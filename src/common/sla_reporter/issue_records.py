@@ -0,0 +1,74 @@
+from typing import Iterable, List
+
+from .changelog_analyzer import IssueTimeline, build_timeline
+from .models import IssueRecord
+
+EPIC_LINK_FIELD = "customfield_10014"
+
+# Changelog fields the SLA timeline reads; every other history item is dropped.
+TIMELINE_FIELDS = frozenset({"status", "assignee"})
+
+
+def compact_histories(raw_histories: Iterable[dict]) -> list:
+    histories = []
+    for history in raw_histories:
+        items = tuple(
+            (item.get("field"), item.get("fromString"), item.get("toString"))
+            for item in history.get("items") or ()
+            if item.get("field") in TIMELINE_FIELDS
+        )
+        if items:
+            histories.append((history["created"], items))
+    return histories
+
+
+def apply_changelog(record: IssueRecord, changelog: dict):
+    raw_histories = changelog.get("histories") or []
+    record.histories = compact_histories(raw_histories)
+    record.changelog_complete = len(raw_histories) >= (changelog.get("total") or 0)
+
+
+def _attribute(value, name):
+    return value.get(name) if value else None
+
+
+def record_from_raw(raw: dict, extra_fields=()) -> IssueRecord:
+    """Build an IssueRecord from one issue of a REST search response."""
+    fields = raw.get("fields") or {}
+    assignee = fields.get("assignee")
+    reporter = fields.get("reporter")
+    record = IssueRecord(
+        key=raw["key"],
+        summary=fields.get("summary"),
+        status=_attribute(fields.get("status"), "name"),
+        priority=_attribute(fields.get("priority"), "name"),
+        created=fields.get("created"),
+        resolution_date=fields.get("resolutiondate"),
+        assignee=assignee.get("displayName", "") if assignee else None,
+        assignee_email=_attribute(assignee, "emailAddress") or "",
+        reporter=reporter.get("displayName", "") if reporter else None,
+        reporter_email=_attribute(reporter, "emailAddress") or "",
+        epic_link=fields.get(EPIC_LINK_FIELD),
+        parent_key=_attribute(fields.get("parent"), "key"),
+        fields={field_id: fields.get(field_id) for field_id in extra_fields},
+        histories=[],
+        changelog_complete=False,
+    )
+    if raw.get("changelog") is not None:
+        apply_changelog(record, raw["changelog"])
+    return record
+
+
+def records_from_raw(raw_issues: Iterable[dict], extra_fields=()) -> List[IssueRecord]:
+    return [record_from_raw(raw, extra_fields) for raw in raw_issues]
+
+
+def record_timeline(record: IssueRecord) -> IssueTimeline:
+    return build_timeline(
+        record.key,
+        record.created,
+        record.status,
+        record.resolution_date,
+        record.assignee is not None,
+        record.histories,
+    )
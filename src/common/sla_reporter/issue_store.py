@@ -0,0 +1,198 @@
+import json
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+from .issue_records import record_from_raw
+from .logger import logger
+
+DEFAULT_STORE_PATH = "reports/issue_store.sqlite3"
+DEFAULT_SYNC_OVERLAP_MINUTES = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    created TEXT,
+    fields_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS histories (
+    issue_key TEXT NOT NULL,
+    history_id TEXT NOT NULL,
+    created TEXT NOT NULL,
+    items_json TEXT NOT NULL,
+    PRIMARY KEY (issue_key, history_id)
+);
+CREATE TABLE IF NOT EXISTS release_issues (
+    release TEXT NOT NULL,
+    issue_key TEXT NOT NULL,
+    PRIMARY KEY (release, issue_key)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    release TEXT PRIMARY KEY,
+    last_sync TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS release_fields (
+    release TEXT PRIMARY KEY,
+    fields_json TEXT NOT NULL
+);
+"""
+
+_sync_locks = {}
+_sync_locks_lock = threading.Lock()
+
+
+def _sync_lock(path):
+    with _sync_locks_lock:
+        return _sync_locks.setdefault(str(path), threading.Lock())
+
+
+class IssueStore:
+    """Local SQLite copy of a release's issues and their changelogs.
+
+    ``sync_release`` pulls only issues updated since the previous sync, so
+    repeat runs transfer the delta rather than the whole release. Each
+    release remembers which fields its issues were stored with; a sync that
+    needs a field they lack re-reads the whole release.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, sync_overlap_minutes=DEFAULT_SYNC_OVERLAP_MINUTES):
+        project_root = Path(__file__).parent.parent.parent.parent
+        self.path = project_root / path
+        self.sync_overlap_minutes = sync_overlap_minutes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def last_sync(self, release):
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT last_sync FROM sync_state WHERE release = ?", (release,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def stored_fields(self, release):
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT fields_json FROM release_fields WHERE release = ?", (release,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def sync_release(self, jira_client, release, release_jql, fields):
+        release_jql = re.split(r"\s+ORDER\s+BY\s+", release_jql, flags=re.IGNORECASE)[0]
+        with _sync_lock(self.path):
+            sync_started = datetime.now(timezone.utc)
+            last_sync = self.last_sync(release)
+            stored_fields = self.stored_fields(release)
+            missing_fields = [field for field in fields if field not in stored_fields]
+            # Changed issues are always stored with every field, old and new, so rows stay uniform.
+            fields = stored_fields + missing_fields
+            if last_sync and missing_fields:
+                logger.info(f"Stored issues for {release} lack fields {missing_fields}; running a full sync")
+                last_sync = None
+            if last_sync:
+                # Relative JQL durations avoid any dependence on the Jira user's timezone.
+                minutes = int((sync_started - last_sync).total_seconds() // 60) + self.sync_overlap_minutes
+                delta_jql = f"({release_jql}) AND updated >= -{minutes}m"
+                logger.info(f"Syncing issues for {release} updated in the last {minutes} minutes")
+            else:
+                delta_jql = release_jql
+                logger.info(f"Running initial issue sync for {release}")
+
+            # Every stored field is kept raw in the record, so loads can rebuild any extra field.
+            changed_issues = jira_client.search_records(delta_jql, extra_fields=fields, expand="changelog")
+            jira_client.complete_record_changelogs(changed_issues)
+            # Key-only listing of the release so issues that left it are dropped.
+            release_keys = jira_client.search_keys(release_jql)
+
+            with closing(self._connect()) as connection, connection:
+                self._upsert_issues(connection, changed_issues)
+                connection.execute("DELETE FROM release_issues WHERE release = ?", (release,))
+                connection.executemany(
+                    "INSERT INTO release_issues (release, issue_key) VALUES (?, ?)",
+                    [(release, key) for key in release_keys],
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO sync_state (release, last_sync) VALUES (?, ?)",
+                    (release, sync_started.isoformat()),
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO release_fields (release, fields_json) VALUES (?, ?)",
+                    (release, json.dumps(fields)),
+                )
+            logger.info(f"Synced {len(changed_issues)} changed issues; {release} has {len(release_keys)} issues")
+
+    def _upsert_issues(self, connection, issues):
+        for issue in issues:
+            connection.execute(
+                "INSERT OR REPLACE INTO issues (key, created, fields_json) VALUES (?, ?, ?)",
+                (issue.key, issue.created, json.dumps(issue.fields)),
+            )
+            # Records carry their complete changelog, so it replaces whatever was stored.
+            connection.execute("DELETE FROM histories WHERE issue_key = ?", (issue.key,))
+            connection.executemany(
+                "INSERT INTO histories (issue_key, history_id, created, items_json) VALUES (?, ?, ?, ?)",
+                [
+                    (issue.key, str(index), created, json.dumps([list(item) for item in items]))
+                    for index, (created, items) in enumerate(issue.histories)
+                ],
+            )
+
+    def load_release(self, release, extra_fields=()):
+        """IssueRecords of a release with their full changelogs."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                """
+                SELECT issues.key, issues.fields_json FROM issues
+                JOIN release_issues ON release_issues.issue_key = issues.key
+                WHERE release_issues.release = ?
+                ORDER BY issues.created DESC
+                """,
+                (release,),
+            ).fetchall()
+            history_rows = connection.execute(
+                """
+                SELECT histories.issue_key, histories.created, histories.items_json FROM histories
+                JOIN release_issues ON release_issues.issue_key = histories.issue_key
+                WHERE release_issues.release = ?
+                ORDER BY histories.created
+                """,
+                (release,),
+            ).fetchall()
+
+        histories = {}
+        for issue_key, created, items_json in history_rows:
+            histories.setdefault(issue_key, []).append({
+                "created": created,
+                "items": [
+                    {"field": field, "fromString": from_value, "toString": to_value}
+                    for field, from_value, to_value in json.loads(items_json)
+                ],
+            })
+        return [
+            record_from_raw(
+                {"key": key, "fields": json.loads(fields_json), "changelog": {"histories": histories.get(key, [])}},
+                extra_fields,
+            )
+            for key, fields_json in rows
+        ]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_issue_store(store_config=None):
+    store_config = store_config or {}
+    if not store_config.get("enabled"):
+        return None
+    path = store_config.get("path", DEFAULT_STORE_PATH)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = IssueStore(
+                path, int(store_config.get("sync_overlap_minutes", DEFAULT_SYNC_OVERLAP_MINUTES))
+            )
+        return store
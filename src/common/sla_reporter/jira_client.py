@@ -1,43 +1,126 @@
+import concurrent.futures
 import os
 from jira import JIRA
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from .config import Config
+from .business_calendar import get_calendar
 from .logger import logger
+from .models import IssueRecord, SlaMetrics
+from .changelog_analyzer import IssueTimeline, analyze_issue, parse_jira_datetime
+from .epic_cache import get_epic_link_cache
+from .issue_records import EPIC_LINK_FIELD, compact_histories, record_from_raw, records_from_raw
+from .request_governor import GovernedAdapter, get_governor
+from typing import List
 from ..credentials import Credentials
 
+# Fields the all_issues and open_issues reports read from each issue. The
+# parent is needed to resolve the epic link of sub-tasks.
+REPORT_FIELDS = [
+    "summary",
+    "assignee",
+    "reporter",
+    "priority",
+    "status",
+    "created",
+    "resolutiondate",
+    "parent",
+    EPIC_LINK_FIELD,
+]
+PARENT_LOOKUP_BATCH_SIZE = 100
+CHANGELOG_PAGE_SIZE = 100
+DEFAULT_SEARCH_PAGE_SIZE = 100
+DEFAULT_SEARCH_WORKERS = 8
+# Cloud's token-paged search/jql endpoint accepts larger pages for key-only listings.
+KEY_LISTING_PAGE_SIZE = 5000
+
 
 def calculate_business_hours(start_date, end_date, holidays):
-    total_minutes = 0
-    current_date = start_date
-    while current_date < end_date:
-        if (
-            current_date.weekday() < 5 and current_date.date() not in holidays
-        ):  # Monday to Friday and not a holiday
-            total_minutes += 1
-        current_date += timedelta(minutes=1)
-    return total_minutes / 60
+    return get_calendar(holidays).business_hours(start_date, end_date)
 
 
 def calculate_business_days(start_date, end_date, holidays):
-    business_days = 0
-    current_date = start_date.date()
-    end_date = end_date.date()
-    while current_date <= end_date:
-        if (
-            current_date.weekday() < 5 and current_date not in holidays
-        ):  # Monday to Friday and not a holiday
-            business_days += 1
-        current_date += timedelta(days=1)
-    return business_days
+    return get_calendar(holidays).business_days(start_date, end_date)
+
+
+def compute_sla_metrics(calendar, timelines: List[IssueTimeline], now=None) -> List[SlaMetrics]:
+    # Gather every interval for every issue, compute business hours in one
+    # vectorized call, then scatter the results back per issue. All metrics
+    # are measured against the same snapshot clock.
+    now = now or datetime.now(timezone.utc)
+    intervals = []
+    layouts = []
+    for timeline in timelines:
+        current_index = len(intervals)
+        intervals.append(timeline.current_status_interval(now))
+
+        assign_interval = timeline.assignment_interval()
+        if assign_interval:
+            assign_index = len(intervals)
+            intervals.append(assign_interval)
+        else:
+            assign_index = None
+
+        statuses = []
+        for status, start_date, end_date in timeline.status_intervals(now):
+            statuses.append((status, len(intervals)))
+            intervals.append((start_date, end_date))
+
+        layouts.append((timeline, current_index, assign_index, statuses))
+
+    hours = calendar.business_hours_batch(intervals).tolist()
+
+    metrics = []
+    for timeline, current_index, assign_index, statuses in layouts:
+        time_in_each_status = {}
+        for status, index in statuses:
+            time_in_each_status[status] = time_in_each_status.get(status, 0) + hours[index]
+        if assign_index is not None:
+            time_to_assign = hours[assign_index]
+        else:
+            time_to_assign = timeline.unassigned_time_to_assign()
+        metrics.append(
+            SlaMetrics(
+                time_in_status=hours[current_index],
+                time_to_assign=time_to_assign,
+                time_in_each_status=time_in_each_status,
+            )
+        )
+    return metrics
 
 
 class SlaJiraClient:
-    def __init__(self, credentials, holidays=None):
+    def __init__(self, credentials, holidays=None, verify_connection=True, http_pool_size=None):
         main_config = Config("config/config.yaml")
         self.jira_config = main_config.get("jira")
         self.credentials = credentials
+        self.verify_connection = verify_connection
+        self.http_pool_size = http_pool_size
+        self.auth_expired = False
         self._client = self._connect()
+        self.set_holidays(holidays)
+        self.epic_link_cache = get_epic_link_cache(self.jira_config.get("epic_link_cache"))
+
+    def set_holidays(self, holidays):
         self.holidays = holidays if holidays is not None else set()
+        self.calendar = get_calendar(self.holidays)
+
+    def _on_response(self, response, *args, **kwargs):
+        # Lets a long-lived client notice expired credentials and reconnect on
+        # its next use instead of testing the connection up front.
+        if response.status_code == 401:
+            self.auth_expired = True
+
+    def reconnect(self):
+        logger.info("Re-authenticating Jira client")
+        self.close()
+        self.auth_expired = False
+        self._client = self._connect()
+
+    def close(self):
+        try:
+            self._client.close()
+        except Exception as e:
+            logger.debug(f"Error closing Jira client: {e}")
 
     def _connect(self):
         server = self.jira_config["server"]
@@ -57,145 +140,247 @@ class SlaJiraClient:
             jira = JIRA(
                 server=server, basic_auth=(jira_email, api_token), max_retries=1
             )
-            # Test connection
-            jira.myself()
+            # Every request is admitted, paced and retried on throttling by the
+            # host's shared governor; keep enough pooled connections alive for it.
+            governor = get_governor(server, self.jira_config.get("rate_limit"))
+            pool_size = self.http_pool_size or governor.max_concurrency
+            adapter = GovernedAdapter(governor, pool_connections=pool_size, pool_maxsize=pool_size)
+            jira._session.mount("https://", adapter)
+            jira._session.mount("http://", adapter)
+            jira._session.hooks["response"].append(self._on_response)
+            if self.verify_connection:
+                # Test connection
+                jira.myself()
             return jira
         except Exception as e:
             logger.error(f"Original Jira connection error: {e}")
             raise ConnectionError(f"Failed to connect to Jira. See logs for original error.")
 
-    def search_issues(self, jql):
-        try:
-            return self._client.search_issues(jql, expand="changelog", maxResults=False)
-        except Exception as e:
-            print(f"Error executing JQL: {jql}\n{e}")
+    def search_keys(self, jql):
+        # Key-only search; errors propagate so callers never mistake a failure for "no issues".
+        if self._client._is_cloud:
+            issues = self._client.enhanced_search_issues(jql, maxResults=False, fields=["key"])
+        else:
+            issues = self._client.search_issues(jql, maxResults=False, fields="key")
+        return [issue.key for issue in issues]
+
+    def _search_page_size(self):
+        return int(self.jira_config.get("search_page_size", DEFAULT_SEARCH_PAGE_SIZE))
+
+    def _search_workers(self):
+        return max(1, int(self.jira_config.get("search_workers", DEFAULT_SEARCH_WORKERS)))
+
+    def _fetch_windows_concurrently(self, fetch_window, windows):
+        # Pages come back in window order regardless of completion order.
+        if not windows:
             return []
+        pages = [None] * len(windows)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(self._search_workers(), len(windows))) as executor:
+            future_to_index = {executor.submit(fetch_window, window): index for index, window in enumerate(windows)}
+            for future in concurrent.futures.as_completed(future_to_index):
+                pages[future_to_index[future]] = future.result()
+        return pages
 
-    def get_time_in_current_status(self, issue):
-        changelog = issue.changelog
-        last_status_change = None
+    def search_records(self, jql, extra_fields=(), expand="changelog") -> List[IssueRecord]:
+        """Search through the raw REST JSON, straight into compact IssueRecords.
 
-        # Define closed statuses
-        closed_statuses = {"Ready for Release", "Ready for Showcase", "Closed", "Done", "Canceled"}
-        current_status_name = issue.fields.status.name
+        Each page is converted by the worker that fetched it, so no jira
+        Resource objects are built and a page's JSON is released as soon as
+        its records exist.
+        """
+        fields = REPORT_FIELDS + [f for f in extra_fields if f not in REPORT_FIELDS]
 
-        end_date_for_calculation = datetime.now(timezone.utc)
+        def convert(raw_issues):
+            return records_from_raw(raw_issues, extra_fields)
 
-        # If the issue is in a closed status and has a resolution date, use that as the end date
-        if current_status_name in closed_statuses and issue.fields.resolutiondate:
-            end_date_for_calculation = datetime.strptime(issue.fields.resolutiondate, "%Y-%m-%dT%H:%M:%S.%f%z")
-        else:
-            # Original logic to find the last status change for open issues
-            for history in reversed(changelog.histories):
-                for item in history.items:
-                    if item.field == "status":
-                        last_status_change = history.created
-                        break
-                if last_status_change:
-                    break
-
-        if last_status_change:
-            start_date = datetime.strptime(last_status_change, "%Y-%m-%dT%H:%M:%S.%f%z")
-        else:
-            # If no status change, calculate from creation date
-            start_date = datetime.strptime(
-                issue.fields.created, "%Y-%m-%dT%H:%M:%S.%f%z"
-            )
+        if self._client._is_cloud:
+            return self._search_raw_by_id_windows(jql, fields, expand, convert)
+        return self._search_raw_by_start_at(jql, fields, expand, convert)
 
-        # Add debug logging here
-        logger.debug(f"Issue: {issue.key}, Status: {current_status_name}")
-        logger.debug(f"  Start Date: {start_date}")
-        logger.debug(f"  End Date for Calculation: {end_date_for_calculation}")
-        calculated_hours = calculate_business_hours(start_date, end_date_for_calculation, self.holidays)
-        logger.debug(f"  Calculated Time in Current Status: {calculated_hours} hours")
+    def _search_raw_by_start_at(self, jql, fields, expand, convert):
+        params = {"jql": jql, "fields": ",".join(fields), "maxResults": self._search_page_size()}
+        if expand:
+            params["expand"] = expand
+        first_page = self._client._get_json("search", params={**params, "startAt": 0})
+        results = convert(first_page.get("issues", []))
+        total = first_page.get("total") or 0
+        page_size = len(results) or params["maxResults"]
+        del first_page
+        windows = list(range(len(results), total, page_size))
+        logger.debug(f"Search returned {total} issues; fetching {len(windows)} more pages of {page_size}")
+
+        def fetch_window(start_at):
+            page = self._client._get_json("search", params={**params, "startAt": start_at, "maxResults": page_size})
+            return convert(page.get("issues", []))
+
+        for page in self._fetch_windows_concurrently(fetch_window, windows):
+            results.extend(page)
+        return results
+
+    def _list_issue_keys(self, jql):
+        # Cloud pages search/jql by token, so the key listing is sequential but cheap.
+        keys = []
+        params = {"jql": jql, "fields": "key", "maxResults": KEY_LISTING_PAGE_SIZE}
+        while True:
+            page = self._client._get_json("search/jql", params=params)
+            keys.extend(issue["key"] for issue in page.get("issues", []))
+            if page.get("isLast", True) or not page.get("nextPageToken"):
+                return keys
+            params["nextPageToken"] = page["nextPageToken"]
+
+    def _search_window(self, params):
+        # Jira may return fewer issues than a key window holds (Cloud caps
+        # pages with changelogs expanded), so follow the window to its end.
+        params = dict(params)
+        issues = []
+        while True:
+            if self._client._is_cloud:
+                page = self._client._get_json("search/jql", params=params)
+                issues.extend(page.get("issues", []))
+                if page.get("isLast", True) or not page.get("nextPageToken"):
+                    return issues
+                params["nextPageToken"] = page["nextPageToken"]
+            else:
+                page = self._client._get_json("search", params={**params, "startAt": len(issues)})
+                page_issues = page.get("issues", [])
+                issues.extend(page_issues)
+                if not page_issues or len(issues) >= (page.get("total") or 0):
+                    return issues
+
+    def _search_raw_by_id_windows(self, jql, fields, expand, convert):
+        page_size = self._search_page_size()
+        keys = self._list_issue_keys(jql)
+        windows = [keys[i:i + page_size] for i in range(0, len(keys), page_size)]
+        logger.debug(f"Search returned {len(keys)} issues; fetching {len(windows)} pages of {page_size}")
+
+        def fetch_window(window):
+            params = {"jql": f"key in ({', '.join(window)})", "fields": ",".join(fields), "maxResults": len(window)}
+            if expand:
+                params["expand"] = expand
+            return convert(self._search_window(params))
+
+        records_by_key = {}
+        for page in self._fetch_windows_concurrently(fetch_window, windows):
+            for record in page:
+                records_by_key[record.key] = record
+        return [records_by_key[key] for key in keys if key in records_by_key]
+
+    def fetch_record_changelogs(self, records: List[IssueRecord]):
+        # Attach changelogs to records searched without them, in concurrent
+        # key windows, then complete any truncated ones.
+        if not records:
+            return records
+        page_size = self._search_page_size()
+        keys = [record.key for record in records]
+        windows = [keys[i:i + page_size] for i in range(0, len(keys), page_size)]
+        logger.debug(f"Fetching changelogs for {len(keys)} issues in {len(windows)} windows")
+
+        def fetch_window(window):
+            params = {"jql": f"key in ({', '.join(window)})", "fields": "key", "maxResults": len(window), "expand": "changelog"}
+            changelogs = {}
+            for raw in self._search_window(params):
+                record = record_from_raw(raw)
+                changelogs[record.key] = (record.histories, record.changelog_complete)
+            return changelogs
+
+        changelogs = {}
+        for page in self._fetch_windows_concurrently(fetch_window, windows):
+            changelogs.update(page)
+        for record in records:
+            if record.key not in changelogs:
+                logger.warning(f"No changelog returned for {record.key}")
+            record.histories, record.changelog_complete = changelogs.get(record.key, ([], True))
+        return self.complete_record_changelogs(records)
 
+    def complete_record_changelogs(self, records: List[IssueRecord]):
+        truncated = [record for record in records if not record.changelog_complete]
+        if not truncated:
+            return records
+        logger.info(f"Fetching full changelog for {len(truncated)} issues with truncated history")
 
+        def fetch_window(record):
+            if self._client._is_cloud:
+                histories = []
+                start_at = 0
+                while True:
+                    page = self._client._get_json(
+                        f"issue/{record.key}/changelog",
+                        params={"startAt": start_at, "maxResults": CHANGELOG_PAGE_SIZE},
+                    )
+                    values = page.get("values", [])
+                    histories.extend(compact_histories(values))
+                    start_at += len(values)
+                    if not values or page.get("isLast", start_at >= (page.get("total") or 0)):
+                        return histories
+            # Server/Data Center returns the whole changelog on a single issue read.
+            raw = self._client._get_json(f"issue/{record.key}", params={"fields": "key", "expand": "changelog"})
+            return compact_histories((raw.get("changelog") or {}).get("histories", []))
+
+        for record, histories in zip(truncated, self._fetch_windows_concurrently(fetch_window, truncated)):
+            record.histories = histories
+            record.changelog_complete = True
+        return records
+
+    def resolve_parent_epics(self, parent_keys):
+        parent_keys = set(parent_keys)
+        epic_links = self.epic_link_cache.get_many(parent_keys)
+        missing_keys = sorted(parent_keys - epic_links.keys())
+        if not missing_keys:
+            return epic_links
+
+        logger.info(f"Resolving epic links for {len(missing_keys)} parent issues ({len(epic_links)} cached)")
+        fetched = {}
+        for i in range(0, len(missing_keys), PARENT_LOOKUP_BATCH_SIZE):
+            batch = missing_keys[i:i + PARENT_LOOKUP_BATCH_SIZE]
+            try:
+                parents = self._client.search_issues(
+                    f"key in ({', '.join(batch)})",
+                    fields=EPIC_LINK_FIELD,
+                    maxResults=False,
+                    validate_query=False,
+                )
+            except Exception as e:
+                logger.warning(f"Could not fetch parent issues {batch}: {e}")
+                continue
+            for parent in parents:
+                fetched[parent.key] = getattr(parent.fields, EPIC_LINK_FIELD, None)
+            # Parents that exist but were not returned have no readable epic link.
+            for key in batch:
+                fetched.setdefault(key, None)
+
+        self.epic_link_cache.put_many(fetched)
+        epic_links.update(fetched)
+        return epic_links
+
+    def get_time_in_current_status(self, issue):
+        timeline = analyze_issue(issue)
+        start_date, end_date = timeline.current_status_interval(datetime.now(timezone.utc))
+        logger.debug(f"Issue: {issue.key}, Status: {timeline.status}")
+        logger.debug(f"  Start Date: {start_date}")
+        logger.debug(f"  End Date for Calculation: {end_date}")
+        calculated_hours = self.calendar.business_hours(start_date, end_date)
+        logger.debug(f"  Calculated Time in Current Status: {calculated_hours} hours")
         return calculated_hours
 
     def get_time_to_assign(self, issue):
-        created_date = datetime.strptime(issue.fields.created, "%Y-%m-%dT%H:%M:%S.%f%z")
-
-        first_assigned_timestamp = None
-        changelog = issue.changelog
-        logger.debug(f"Getting time to assign for issue {issue.key}")
-
-        for history in changelog.histories:
-            for item in history.items:
-                if item.field == "assignee":
-                    # Check for transition from unassigned (None or empty string) to assigned
-                    from_value = item.fromString if hasattr(item, 'fromString') else None
-                    to_value = item.toString if hasattr(item, 'toString') else None
-                    logger.debug(f"Assignee change for {issue.key}: from='{from_value}' to='{to_value}'")
-
-                    if (from_value is None or from_value == '') and (to_value is not None and to_value != ''):
-                        first_assigned_timestamp = datetime.strptime(
-                            history.created, "%Y-%m-%dT%H:%M:%S.%f%z"
-                        )
-                        logger.debug(f"Found first assignment for {issue.key} at {first_assigned_timestamp}")
-                        break # Found the first assignment, break inner loop
-            if first_assigned_timestamp:
-                break # Found the first assignment, break outer loop
-
-        if first_assigned_timestamp:
-            return calculate_business_hours(
-                created_date, first_assigned_timestamp, self.holidays
-            )
-        else:
-            # If no transition from unassigned to assigned is found
-            # Check if it was assigned at creation and never unassigned
-            if getattr(issue.fields, "assignee", None):
-                logger.debug(f"Issue {issue.key} was assigned at creation or never unassigned.")
-                return 0 # Assigned at creation or never unassigned
-            else:
-                logger.debug(f"Issue {issue.key} is unassigned and was never assigned.")
-                return None # Currently unassigned and was never assigned
+        timeline = analyze_issue(issue)
+        interval = timeline.assignment_interval()
+        if interval:
+            return self.calendar.business_hours(*interval)
+        return timeline.unassigned_time_to_assign()
 
     def get_business_days_to_resolve(self, issue):
         if not issue.fields.resolutiondate:
             return None
-        created_date = datetime.strptime(issue.fields.created, "%Y-%m-%dT%H:%M:%S.%f%z")
-        resolution_date = datetime.strptime(
-            issue.fields.resolutiondate, "%Y-%m-%dT%H:%M:%S.%f%z"
-        )
-        return calculate_business_days(created_date, resolution_date, self.holidays)
+        created_date = parse_jira_datetime(issue.fields.created)
+        resolution_date = parse_jira_datetime(issue.fields.resolutiondate)
+        return self.calendar.business_days(created_date, resolution_date)
 
     def get_time_in_each_status(self, issue):
         time_in_status = {}
-        
-        all_status_transitions = []
-        for history in issue.changelog.histories:
-            history_date = datetime.strptime(history.created, "%Y-%m-%dT%H:%M:%S.%f%z")
-            for item in history.items:
-                if item.field == "status":
-                    all_status_transitions.append((history_date, item.fromString, item.toString))
-        
-        all_status_transitions.sort(key=lambda x: x[0])
-
-        initial_creation_date = datetime.strptime(issue.fields.created, "%Y-%m-%dT%H:%M:%S.%f%z")
-
-        current_status = issue.fields.status.name # Default to current status
-        last_change_timestamp = initial_creation_date # Initialize here
-
-        if all_status_transitions:
-            current_status = all_status_transitions[0][1] # The status before the first change
-
-        for transition_time, status_from, status_to in all_status_transitions:
-            time_spent = calculate_business_hours(last_change_timestamp, transition_time, self.holidays)
-            
-            if status_from in time_in_status:
-                time_in_status[status_from] += time_spent
-            else:
-                time_in_status[status_from] = time_spent
-            
-            current_status = status_to
-            last_change_timestamp = transition_time
-
-        now = datetime.now(timezone.utc)
-        time_spent_in_final_status = calculate_business_hours(last_change_timestamp, now, self.holidays)
-        
-        if current_status in time_in_status:
-            time_in_status[current_status] += time_spent_in_final_status
-        else:
-            time_in_status[current_status] = time_spent_in_final_status
+        for status, start_date, end_date in analyze_issue(issue).status_intervals(datetime.now(timezone.utc)):
+            time_in_status[status] = time_in_status.get(status, 0) + self.calendar.business_hours(start_date, end_date)
+        return time_in_status
 
-        return time_in_status
\ No newline at end of file
+    def get_sla_metrics_batch(self, timelines: List[IssueTimeline], now=None) -> List[SlaMetrics]:
+        return compute_sla_metrics(self.calendar, timelines, now)
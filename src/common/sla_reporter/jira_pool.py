@@ -0,0 +1,78 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+from .jira_client import SlaJiraClient
+from .logger import logger
+
+DEFAULT_POOL_SIZE = 4
+
+
+class JiraClientPool:
+    """A bounded set of long-lived, authenticated SlaJiraClients.
+
+    Clients are created on first demand, keep their HTTP connections alive
+    between reports, and skip the per-connection ``myself()`` check. A
+    client whose credentials were rejected is re-authenticated the next time
+    it is leased.
+    """
+
+    def __init__(self, credentials, size=DEFAULT_POOL_SIZE, http_pool_size=None):
+        self.credentials = credentials
+        self.size = size
+        self.http_pool_size = http_pool_size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create_client(self):
+        logger.info(f"Creating pooled Jira client {self._created}/{self.size}")
+        return SlaJiraClient(
+            credentials=self.credentials,
+            verify_connection=False,
+            http_pool_size=self.http_pool_size,
+        )
+
+    def _acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._create_client()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get(timeout=timeout)
+
+    def _release(self, client):
+        if self._closed:
+            client.close()
+        else:
+            self._idle.put(client)
+
+    @contextmanager
+    def lease(self, holidays=None, timeout=None):
+        client = self._acquire(timeout=timeout)
+        try:
+            if client.auth_expired:
+                client.reconnect()
+            client.set_holidays(holidays)
+            yield client
+        finally:
+            self._release(client)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
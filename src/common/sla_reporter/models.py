@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime
 
 
@@ -44,8 +44,95 @@ class IssueDetails:
     team: Optional[str] = None
 
 
+@dataclass(slots=True)
+class IssueRecord:
+    # Compact form of a searched issue: only what IssueDetails, team
+    # assignment and section predicates read.
+    key: str
+    summary: str
+    status: str
+    priority: Optional[str]
+    created: str
+    resolution_date: Optional[str]
+    assignee: Optional[str]
+    assignee_email: str
+    reporter: Optional[str]
+    reporter_email: str
+    epic_link: Optional[str]
+    parent_key: Optional[str]
+    # Raw values of the extra fields section predicates test.
+    fields: Dict[str, Any]
+    # (created, ((field, fromString, toString), ...)) for status and assignee changes only.
+    histories: List[Tuple[str, Tuple[Tuple[str, Optional[str], Optional[str]], ...]]]
+    changelog_complete: bool = True
+
+
+@dataclass
+class SlaMetrics:
+    time_in_status: float
+    time_to_assign: Optional[float]
+    time_in_each_status: Dict[str, float]
+
+
 @dataclass
 class ReportData:
     name: str
     jql: str
     issues: List[IssueDetails]
+
+
+@dataclass(slots=True)
+class EnrichedIssue:
+    # Display-ready row: every value a report template prints, already computed and formatted.
+    key: str
+    summary: str
+    assignee: str
+    assignee_email: str
+    reporter: str
+    reporter_email: str
+    priority: str
+    status: str
+    sla: float
+    reported_time: str
+    total_time_open: str
+    business_hours_open: str
+    time_in_status: str
+    time_to_assign: str
+    time_in_each_status: str
+    row_class: str
+    sla_status: str
+    root_cause: str = "N/A"
+    rca_category: str = "N/A"
+
+
+@dataclass
+class EnrichedSection:
+    name: str
+    jql: str
+    # (team, issues) pairs sorted by team name, "no epic tagged" last.
+    issues_by_team: List[Tuple[str, List[EnrichedIssue]]]
+    # Issues left out of issues_by_team by a per-section row cap.
+    hidden_issues: int = 0
+
+
+@dataclass(frozen=True)
+class CachedReport:
+    # Shared between requests; treat every field as read-only.
+    html: str
+    reports_data: List[Any]
+    days_since_branch_cut: Any
+    release_info: Optional[ReleaseInfo]
+
+
+@dataclass(frozen=True)
+class StructuredReport:
+    # Typed rows of every section, ordered by section then team (see report_json).
+    # Shared between requests; treat every field as read-only.
+    release_info: Optional[ReleaseInfo]
+    days_since_branch_cut: Any
+    # (name, jql, [(team, first row, end row), ...]) per section.
+    sections: List[Tuple[str, str, List[Tuple[str, int, int]]]]
+    rows: List[tuple]
+    version: str
+    # When open issues' hours were counted; not part of the version.
+    as_of: str
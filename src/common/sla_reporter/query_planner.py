@@ -0,0 +1,309 @@
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+from .logger import logger
+
+# JQL names of system fields the planner can evaluate locally, mapped to their field ids.
+SYSTEM_FIELDS = {
+    "status": "status",
+    "priority": "priority",
+    "project": "project",
+    "type": "issuetype",
+    "issuetype": "issuetype",
+    "resolution": "resolution",
+    "labels": "labels",
+    "fixversion": "fixVersions",
+    "component": "components",
+}
+
+_TOKEN_PATTERN = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|(!=|=|\(|\)|,)|([^\s"=!(),]+))')
+
+
+class UnsupportedJql(ValueError):
+    pass
+
+
+@dataclass
+class Token:
+    text: str
+    quoted: bool = False
+
+    def keyword(self):
+        return None if self.quoted else self.text.upper()
+
+
+def tokenize(jql: str) -> List[Token]:
+    tokens = []
+    position = 0
+    jql = jql.rstrip()
+    while position < len(jql):
+        match = _TOKEN_PATTERN.match(jql, position)
+        if not match or match.end() == position:
+            raise UnsupportedJql(f"Cannot tokenize JQL at: {jql[position:]!r}")
+        quoted, symbol, word = match.groups()
+        if quoted is not None:
+            tokens.append(Token(quoted.replace('\\"', '"'), quoted=True))
+        else:
+            tokens.append(Token(symbol or word))
+        position = match.end()
+    return tokens
+
+
+def split_conjuncts(jql: str):
+    """Split a JQL query into its top-level AND clauses and its ORDER BY suffix."""
+    tokens = tokenize(jql)
+    order_by = []
+    for i in range(len(tokens) - 1):
+        if tokens[i].keyword() == "ORDER" and tokens[i + 1].keyword() == "BY":
+            tokens, order_by = tokens[:i], tokens[i:]
+            break
+
+    conjuncts = [[]]
+    depth = 0
+    for token in tokens:
+        if token.text == "(" and not token.quoted:
+            depth += 1
+        elif token.text == ")" and not token.quoted:
+            depth -= 1
+        if depth == 0 and token.keyword() == "OR":
+            raise UnsupportedJql("Top-level OR cannot be split into clauses")
+        if depth == 0 and token.keyword() == "AND":
+            conjuncts.append([])
+        else:
+            conjuncts[-1].append(token)
+    return [clause for clause in conjuncts if clause], order_by
+
+
+def render_tokens(tokens: List[Token]) -> str:
+    parts = []
+    for token in tokens:
+        if token.quoted:
+            parts.append('"' + token.text.replace('"', '\\"') + '"')
+        else:
+            parts.append(token.text)
+    return re.sub(r"\( ", "(", re.sub(r" ([,)])", r"\1", " ".join(parts)))
+
+
+def _clause_key(tokens: List[Token]) -> str:
+    return render_tokens(tokens).lower()
+
+
+class FieldResolver:
+    """Maps JQL field names to Jira field ids using resources/jira_fields.yml."""
+
+    def __init__(self, fields_path=None):
+        if fields_path is None:
+            fields_path = Path(__file__).parent.parent.parent.parent / "resources" / "jira_fields.yml"
+        self._by_name = {}
+        ambiguous = set()
+        try:
+            with open(fields_path, "r") as f:
+                field_names = yaml.safe_load(f) or {}
+        except OSError as e:
+            logger.warning(f"Could not read Jira field names from {fields_path}: {e}")
+            field_names = {}
+        for field_id, name in field_names.items():
+            key = str(name).lower()
+            if key in self._by_name:
+                ambiguous.add(key)
+            self._by_name[key] = field_id
+        for key in ambiguous:
+            del self._by_name[key]
+
+    def resolve(self, name: str) -> str:
+        # "Found In[Radio Buttons]" -> "found in"; cf[10042] -> customfield_10042
+        cf_match = re.fullmatch(r"cf\[(\d+)\]", name.strip(), re.IGNORECASE)
+        if cf_match:
+            return f"customfield_{cf_match.group(1)}"
+        key = re.sub(r"\[[^\]]*\]$", "", name).strip().lower()
+        if key in SYSTEM_FIELDS:
+            return SYSTEM_FIELDS[key]
+        if key.startswith("customfield_"):
+            return key
+        if key in self._by_name:
+            return self._by_name[key]
+        raise UnsupportedJql(f"Unknown or ambiguous JQL field: {name!r}")
+
+
+def _field_values(value) -> set:
+    # Normalize a Jira field value (option, list of options, named resource,
+    # plain string) into the lowercase strings JQL equality compares against.
+    if value is None:
+        return set()
+    if isinstance(value, (list, tuple, set)):
+        values = set()
+        for item in value:
+            values |= _field_values(item)
+        return values
+    if isinstance(value, dict):
+        candidates = [value.get(attr) for attr in ("value", "name", "key")]
+    elif isinstance(value, (str, int, float)):
+        candidates = [value]
+    else:
+        candidates = [getattr(value, attr, None) for attr in ("value", "name", "key")]
+    return {str(candidate).lower() for candidate in candidates if candidate is not None}
+
+
+def _get_field(fields, field_id):
+    if isinstance(fields, dict):
+        return fields.get(field_id)
+    return getattr(fields, field_id, None)
+
+
+def compile_clause(tokens: List[Token], resolver: FieldResolver):
+    """Compile one ``field op value(s)`` clause into (field_id, predicate)."""
+    if len(tokens) < 3:
+        raise UnsupportedJql(f"Unsupported clause: {render_tokens(tokens)}")
+    field_id = resolver.resolve(tokens[0].text)
+    rest = tokens[1:]
+    if rest[0].keyword() == "NOT" and len(rest) > 1 and rest[1].keyword() == "IN":
+        operator, rest = "not in", rest[2:]
+    elif rest[0].keyword() == "IN":
+        operator, rest = "in", rest[1:]
+    elif rest[0].text in ("=", "!=") and not rest[0].quoted:
+        operator, rest = rest[0].text, rest[1:]
+    else:
+        raise UnsupportedJql(f"Unsupported operator in clause: {render_tokens(tokens)}")
+
+    if operator in ("in", "not in"):
+        if len(rest) < 2 or rest[0].text != "(" or rest[-1].text != ")":
+            raise UnsupportedJql(f"Malformed value list: {render_tokens(tokens)}")
+        items = rest[1:-1]
+        values = [token for i, token in enumerate(items) if i % 2 == 0]
+        separators = [token for i, token in enumerate(items) if i % 2 == 1]
+        if any(separator.text != "," for separator in separators):
+            raise UnsupportedJql(f"Malformed value list: {render_tokens(tokens)}")
+    else:
+        if len(rest) != 1:
+            raise UnsupportedJql(f"Unsupported value in clause: {render_tokens(tokens)}")
+        values = rest
+    if any(not value.quoted and value.keyword() in ("EMPTY", "NULL") or value.text.endswith("()") for value in values):
+        raise UnsupportedJql(f"Unsupported value in clause: {render_tokens(tokens)}")
+    expected = {value.text.lower() for value in values}
+
+    def predicate(issue):
+        actual = _field_values(_get_field(issue.fields, field_id))
+        if operator in ("=", "in"):
+            return bool(actual & expected)
+        # JQL negations never match empty fields.
+        return bool(actual) and not (actual & expected)
+
+    return field_id, predicate
+
+
+@dataclass
+class SectionPlan:
+    report_config: dict
+    jql: str
+    predicate: Optional[Callable] = None
+
+
+@dataclass
+class QueryPlan:
+    superset_jql: Optional[str] = None
+    fields: List[str] = field(default_factory=list)
+    # Sections answered by partitioning the superset result locally.
+    partitioned: List[SectionPlan] = field(default_factory=list)
+    # Sections that still need their own Jira search.
+    standalone: List[SectionPlan] = field(default_factory=list)
+
+
+def _all_of(predicates):
+    def predicate(issue):
+        return all(check(issue) for check in predicates)
+    return predicate
+
+
+def plan_sections(section_jqls: Dict[str, str], report_configs: List[dict], resolver: FieldResolver = None) -> QueryPlan:
+    """Find the clauses every section shares and turn the rest into local predicates.
+
+    ``section_jqls`` maps each report name to its final JQL.
+    """
+    resolver = resolver or FieldResolver()
+    plan = QueryPlan()
+
+    parsed = {}
+    for report_config in report_configs:
+        jql = section_jqls[report_config["name"]]
+        try:
+            parsed[report_config["name"]] = split_conjuncts(jql)
+        except UnsupportedJql as e:
+            logger.debug(f"Section '{report_config['name']}' cannot share a superset query: {e}")
+            plan.standalone.append(SectionPlan(report_config, jql))
+
+    candidates = [config for config in report_configs if config["name"] in parsed]
+    order_bys = {_clause_key(parsed[config["name"]][1]) for config in candidates}
+    if len(candidates) < 2 or len(order_bys) > 1:
+        plan.standalone.extend(SectionPlan(config, section_jqls[config["name"]]) for config in candidates)
+        return plan
+
+    clause_sets = [{_clause_key(clause) for clause in parsed[config["name"]][0]} for config in candidates]
+    common_keys = set.intersection(*clause_sets)
+    first_conjuncts, order_by = parsed[candidates[0]["name"]]
+    common_clauses = [clause for clause in first_conjuncts if _clause_key(clause) in common_keys]
+    if not common_clauses:
+        plan.standalone.extend(SectionPlan(config, section_jqls[config["name"]]) for config in candidates)
+        return plan
+
+    fields = []
+    for config in candidates:
+        jql = section_jqls[config["name"]]
+        try:
+            compiled = [
+                compile_clause(clause, resolver)
+                for clause in parsed[config["name"]][0]
+                if _clause_key(clause) not in common_keys
+            ]
+        except UnsupportedJql as e:
+            logger.debug(f"Section '{config['name']}' needs its own query: {e}")
+            plan.standalone.append(SectionPlan(config, jql))
+            continue
+        for field_id, _ in compiled:
+            if field_id not in fields:
+                fields.append(field_id)
+        plan.partitioned.append(SectionPlan(config, jql, _all_of([predicate for _, predicate in compiled])))
+
+    if len(plan.partitioned) < 2:
+        plan.standalone.extend(plan.partitioned)
+        plan.partitioned = []
+        return plan
+
+    plan.superset_jql = " AND ".join(render_tokens(clause) for clause in common_clauses)
+    if order_by:
+        plan.superset_jql += " " + render_tokens(order_by)
+    plan.fields = fields
+    return plan
+
+
+def plan_against_base(section_jqls: Dict[str, str], report_configs: List[dict], base_jql: str, resolver: FieldResolver = None) -> QueryPlan:
+    """Plan sections as local predicates over a dataset already fetched with ``base_jql``."""
+    resolver = resolver or FieldResolver()
+    plan = QueryPlan(superset_jql=base_jql)
+    try:
+        base_conjuncts, _ = split_conjuncts(base_jql)
+    except UnsupportedJql:
+        plan.standalone = [SectionPlan(config, section_jqls[config["name"]]) for config in report_configs]
+        return plan
+    base_keys = {_clause_key(clause) for clause in base_conjuncts}
+
+    for config in report_configs:
+        jql = section_jqls[config["name"]]
+        try:
+            conjuncts, _ = split_conjuncts(jql)
+            clause_keys = {_clause_key(clause) for clause in conjuncts}
+            if not base_keys <= clause_keys:
+                raise UnsupportedJql("Section does not narrow the base query")
+            compiled = [compile_clause(clause, resolver) for clause in conjuncts if _clause_key(clause) not in base_keys]
+        except UnsupportedJql as e:
+            logger.debug(f"Section '{config['name']}' needs its own query: {e}")
+            plan.standalone.append(SectionPlan(config, jql))
+            continue
+        for field_id, _ in compiled:
+            if field_id not in plan.fields:
+                plan.fields.append(field_id)
+        plan.partitioned.append(SectionPlan(config, jql, _all_of([predicate for _, predicate in compiled])))
+    return plan
@@ -0,0 +1,199 @@
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .logger import logger
+from .query_planner import _field_values, _get_field
+
+DEFAULT_REFRESH_SECONDS = 300
+DEFAULT_IDLE_SECONDS = 3600
+DEFAULT_MAX_RELEASES = 4
+
+
+def _bitsets(values_per_issue, size):
+    # value -> packed bitset of the issues holding it
+    masks = {}
+    for row, values in enumerate(values_per_issue):
+        for value in values:
+            mask = masks.get(value)
+            if mask is None:
+                mask = masks[value] = np.zeros(size, dtype=bool)
+            mask[row] = True
+    return {value: np.packbits(mask) for value, mask in masks.items()}
+
+
+class ReleaseDataset:
+    """Every issue of one release, with a bitset per indexed value.
+
+    ``sections`` holds, per report section, the issues its JQL selects with
+    the status clause left out; ``indexes`` holds team, status, priority and
+    severity bitsets. A filter combination is the section's bitset ANDed with,
+    per filtered column, the OR of the selected values' bitsets. Status,
+    priority and severity compare case-insensitively, as JQL does.
+    """
+
+    def __init__(self, release_version, issue_details, size, sections, indexes):
+        self.release_version = release_version
+        self.issue_details = issue_details
+        self.size = size
+        self.sections = sections
+        self.indexes = indexes
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, release_version, issues, issue_teams, issue_details, section_plans, severity_field=None):
+        size = len(issues)
+        sections = {
+            section.report_config["name"]: np.packbits(np.array([bool(section.predicate(issue)) for issue in issues], dtype=bool))
+            for section in section_plans
+        }
+        indexes = {
+            "team": _bitsets(([team] for team in issue_teams), size),
+            "status": _bitsets(({issue.status.lower()} if issue.status else () for issue in issues), size),
+            "priority": _bitsets(({issue.priority.lower()} if issue.priority else () for issue in issues), size),
+        }
+        if severity_field:
+            indexes["severity"] = _bitsets((_field_values(_get_field(issue.fields, severity_field)) for issue in issues), size)
+        return cls(release_version, issue_details, size, sections, indexes)
+
+    def answers(self, section_names, selected_severities=()):
+        # False when a section, or the severity field, could not be evaluated locally.
+        if selected_severities and "severity" not in self.indexes:
+            return False
+        return all(name in self.sections for name in section_names)
+
+    def _any_of(self, column, values):
+        index = self.indexes[column]
+        if column != "team":
+            values = {value.lower() for value in values}
+        mask = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in index:
+                mask |= index[value]
+        return mask
+
+    def select(self, section_name, selected_team="All", selected_statuses=(), selected_priorities=(), selected_severities=()):
+        """Rows of issue_details in section_name that pass every filter; empty filters select everything."""
+        mask = self.sections[section_name].copy()
+        filters = {
+            "team": [selected_team] if selected_team and selected_team != "All" else [],
+            "status": selected_statuses,
+            "priority": selected_priorities,
+            "severity": selected_severities,
+        }
+        for column, values in filters.items():
+            if values:
+                mask &= self._any_of(column, values)
+        return np.flatnonzero(np.unpackbits(mask, count=self.size))
+
+
+class _Entry:
+    __slots__ = ("dataset", "build", "last_read")
+
+    def __init__(self, dataset, build):
+        self.dataset = dataset
+        self.build = build
+        self.last_read = time.monotonic()
+
+
+class ReleaseDatasets:
+    """Per-release datasets, built on first use and rebuilt in the background.
+
+    A background thread rebuilds every dataset each refresh_seconds and swaps
+    it in whole, so readers never see a half-built one and keep the previous
+    dataset when a rebuild fails. Releases unread for idle_seconds are
+    dropped, as is the least recently read beyond max_releases. Concurrent
+    first reads of a release share one build.
+    """
+
+    def __init__(self, refresh_seconds=DEFAULT_REFRESH_SECONDS, idle_seconds=DEFAULT_IDLE_SECONDS,
+                 max_releases=DEFAULT_MAX_RELEASES):
+        self.refresh_seconds = refresh_seconds
+        self.idle_seconds = idle_seconds
+        self.max_releases = max_releases
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._refresher = None
+
+    def get(self, release_version, build) -> ReleaseDataset:
+        """The release's dataset, calling build() to create it when there is none yet."""
+        with self._lock:
+            entry = self._entries.get(release_version)
+            if entry is not None:
+                entry.last_read = time.monotonic()
+                self._entries.move_to_end(release_version)
+                return entry.dataset
+            future = self._in_flight.get(release_version)
+            owner = future is None
+            if owner:
+                future = self._in_flight[release_version] = concurrent.futures.Future()
+        if not owner:
+            return future.result()
+
+        try:
+            dataset = build()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[release_version]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[release_version]
+            self._entries[release_version] = _Entry(dataset, build)
+            while len(self._entries) > self.max_releases:
+                self._entries.popitem(last=False)
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="release-dataset-refresh", daemon=True)
+                self._refresher.start()
+        future.set_result(dataset)
+        logger.info(f"Built release dataset for {release_version} with {dataset.size} issues")
+        return dataset
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_seconds)
+            self.refresh()
+
+    def refresh(self):
+        now = time.monotonic()
+        with self._lock:
+            for release_version in [release for release, entry in self._entries.items() if now - entry.last_read > self.idle_seconds]:
+                logger.info(f"Dropping idle release dataset for {release_version}")
+                del self._entries[release_version]
+            due = [(release_version, entry.build) for release_version, entry in self._entries.items()]
+
+        for release_version, build in due:
+            try:
+                dataset = build()
+            except Exception as e:
+                logger.error(f"Failed to refresh release dataset for {release_version}, keeping the previous one: {e}")
+                continue
+            with self._lock:
+                entry = self._entries.get(release_version)
+                if entry is not None:
+                    entry.dataset = dataset
+            logger.info(f"Refreshed release dataset for {release_version} with {dataset.size} issues")
+
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def get_release_datasets(dataset_config=None):
+    # One registry per setting for the whole process, shared by every Reporter.
+    dataset_config = dataset_config or {}
+    if not dataset_config.get("enabled"):
+        return None
+    refresh_seconds = float(dataset_config.get("refresh_seconds", DEFAULT_REFRESH_SECONDS))
+    idle_seconds = float(dataset_config.get("idle_seconds", DEFAULT_IDLE_SECONDS))
+    max_releases = int(dataset_config.get("max_releases", DEFAULT_MAX_RELEASES))
+    key = (refresh_seconds, idle_seconds, max_releases)
+    with _datasets_lock:
+        datasets = _datasets.get(key)
+        if datasets is None:
+            datasets = _datasets[key] = ReleaseDatasets(refresh_seconds, idle_seconds, max_releases)
+        return datasets
@@ -0,0 +1,158 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+
+from .logger import logger
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_PAGE_TTL_SECONDS = 600
+
+
+def _normalized(values):
+    return tuple(sorted({value for value in values or () if value}))
+
+
+def report_cache_key(release_version, report_type, selected_team="All", selected_statuses=(), selected_priorities=(),
+                     selected_severities=(), selected_platforms=()):
+    # Requests that select the same issues share a key, whatever the order of their filter values.
+    platforms = _normalized(selected_platforms)
+    return (
+        release_version,
+        report_type,
+        selected_team or "All",
+        _normalized(selected_statuses),
+        _normalized(selected_priorities),
+        _normalized(selected_severities),
+        () if "All" in platforms else platforms,
+    )
+
+
+class ReportResultCache:
+    """Finished report results keyed by the normalized report request.
+
+    Entries expire after ttl_seconds and the least recently used one is
+    evicted beyond max_entries. Concurrent misses on one key share a single
+    computation: the first caller computes while the others, blocking or
+    async, wait for its result. Failures are never cached.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = 0
+
+    def _claim(self, key):
+        # (value, None, False) on a hit, else (None, future, True if this caller must compute).
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, None, False
+                del self._entries[key]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+            future = self._in_flight[key] = concurrent.futures.Future()
+            self.misses += 1
+            return None, future, True
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _settle(self, key, future, value=None, error=None, cacheable=None):
+        with self._lock:
+            del self._in_flight[key]
+            if error is None and (cacheable is None or cacheable(value)):
+                self._store(key, value)
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def get_or_compute(self, key, compute, cacheable=None):
+        value, future, owner = self._claim(key)
+        if future is None:
+            logger.info(f"Report cache hit for {key}")
+            return value
+        if not owner:
+            logger.info(f"Waiting for the in-flight report for {key}")
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, value, cacheable=cacheable)
+        return value
+
+    async def get_or_compute_async(self, key, compute, cacheable=None):
+        value, future, owner = self._claim(key)
+        if future is None:
+            logger.info(f"Report cache hit for {key}")
+            return value
+        if not owner:
+            logger.info(f"Waiting for the in-flight report for {key}")
+            return await asyncio.wrap_future(future)
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, value, cacheable=cacheable)
+        return value
+
+    def put(self, key, value):
+        # Replace the entry with a freshly computed value.
+        with self._lock:
+            self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _shared_cache(ttl_seconds, max_entries):
+    # One cache per setting for the whole process, shared by every Reporter.
+    with _caches_lock:
+        cache = _caches.get((ttl_seconds, max_entries))
+        if cache is None:
+            cache = _caches[(ttl_seconds, max_entries)] = ReportResultCache(ttl_seconds, max_entries)
+        return cache
+
+
+def get_report_cache(cache_config=None):
+    cache_config = cache_config or {}
+    if not cache_config.get("enabled"):
+        return None
+    return _shared_cache(
+        float(cache_config.get("ttl_seconds", DEFAULT_TTL_SECONDS)),
+        int(cache_config.get("max_entries", DEFAULT_MAX_ENTRIES)),
+    )
+
+
+def get_report_page_cache(page_config=None):
+    # Always on: cursor pages and revalidations of the JSON report read the
+    # copy its first page built instead of querying Jira again.
+    page_config = page_config or {}
+    return _shared_cache(
+        float(page_config.get("ttl_seconds", DEFAULT_PAGE_TTL_SECONDS)),
+        int(page_config.get("max_entries", DEFAULT_MAX_ENTRIES)),
+    )
@@ -0,0 +1,167 @@
+import csv
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from .columnar_report import ColumnarReportData
+from .logger import logger
+from .models import ReportData
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+BASE_COLUMNS = [
+    'Jira ID', 'Description', 'Assignee', 'Reporter', 'Priority', 'Current Status',
+    'Actual Time Took (hours)', 'Rootcause(RCA)', 'RCA Category',
+]
+# Rows converted from a column store, and rows per Parquet row group, at a time.
+EXPORT_BATCH_ROWS = 10000
+
+
+def _report_statuses(reports_data: List[ReportData]) -> List[str]:
+    # Statuses in first-seen order, one "Time in ... (hours)" column each.
+    statuses = {}
+    for report_data in reports_data:
+        if isinstance(report_data, ColumnarReportData):
+            table = report_data.table
+            entered = ~np.isnan(table.status_hours[:, report_data.rows]).all(axis=1)
+            for status, has_hours in zip(table.statuses, entered.tolist()):
+                if has_hours:
+                    statuses.setdefault(status, None)
+        else:
+            for issue in report_data.issues:
+                for status in issue.time_in_each_status:
+                    statuses.setdefault(status, None)
+    return list(statuses)
+
+
+def _labels(table, column, rows):
+    codes, labels = table._encoded(column)
+    return [labels[code] for code in codes[rows].tolist()]
+
+
+def _columnar_rows(report_data: ColumnarReportData, statuses) -> Iterator[tuple]:
+    table = report_data.table
+    status_index = {status: position for position, status in enumerate(table.statuses)}
+    positions = [status_index.get(status) for status in statuses]
+    for start in range(0, len(report_data.rows), EXPORT_BATCH_ROWS):
+        rows = report_data.rows[start:start + EXPORT_BATCH_ROWS]
+        hours = np.zeros((len(statuses), len(rows)))
+        for column, position in enumerate(positions):
+            if position is not None:
+                hours[column] = np.nan_to_num(table.status_hours[position, rows])
+        status_columns = hours.tolist()
+        yield from zip(
+            [table.keys[row] for row in rows.tolist()],
+            [table.summaries[row] for row in rows.tolist()],
+            _labels(table, "assignee", rows),
+            _labels(table, "reporter", rows),
+            _labels(table, "priority", rows),
+            _labels(table, "status", rows),
+            table.time_in_status[rows].tolist(),
+            ['N/A'] * len(rows),
+            ['N/A'] * len(rows),
+            *status_columns,
+        )
+
+
+def iter_export_rows(reports_data: List[ReportData], statuses) -> Iterator[tuple]:
+    """Yield one tuple per issue in BASE_COLUMNS order, followed by the hours in each of statuses."""
+    for report_data in reports_data:
+        if isinstance(report_data, ColumnarReportData):
+            yield from _columnar_rows(report_data, statuses)
+            continue
+        for issue in report_data.issues:
+            time_in_each_status = issue.time_in_each_status
+            yield (
+                issue.key,
+                issue.summary,
+                issue.assignee,
+                issue.reporter,
+                issue.priority,
+                issue.status,
+                issue.time_in_status,
+                getattr(issue, 'root_cause', 'N/A'),
+                getattr(issue, 'rca_category', 'N/A'),
+                *(time_in_each_status.get(status, 0) for status in statuses),
+            )
+
+
+def _write_xlsx(path, header, rows):
+    # Write-only workbooks stream rows to disk instead of holding every cell in memory.
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    header_cells = []
+    for name in header:
+        cell = WriteOnlyCell(sheet, value=name)
+        cell.font = Font(bold=True)
+        header_cells.append(cell)
+    sheet.append(header_cells)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_parquet(path, header, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    numeric = {'Actual Time Took (hours)'} | set(header[len(BASE_COLUMNS):])
+    schema = pa.schema([(name, pa.float64() if name in numeric else pa.string()) for name in header])
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in _batches(rows, EXPORT_BATCH_ROWS):
+            columns = [pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+
+
+_WRITERS = {"xlsx": _write_xlsx, "csv": _write_csv, "parquet": _write_parquet}
+
+
+def export_report(reports_data: List[ReportData], path, export_format=None):
+    """Write every issue of every section to a spreadsheet, one row at a time.
+
+    The format comes from export_format or the file suffix. Returns the path
+    written, or None when the format is unknown or its library (pyarrow for
+    Parquet) is not installed.
+    """
+    path = Path(path)
+    export_format = (export_format or path.suffix.lstrip(".")).lower()
+    writer = _WRITERS.get(export_format)
+    if writer is None:
+        logger.error(f"Unknown report export format '{export_format}'. Expected one of {', '.join(EXPORT_FORMATS)}.")
+        return None
+
+    statuses = _report_statuses(reports_data)
+    header = BASE_COLUMNS + [f"Time in {status} (hours)" for status in statuses]
+    try:
+        writer(path, header, iter_export_rows(reports_data, statuses))
+    except ImportError as e:
+        logger.error(f"Cannot export {export_format} report, missing dependency: {e}")
+        return None
+    logger.info(f"Exported {export_format} report to {path}")
+    return path
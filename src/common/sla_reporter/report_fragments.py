@@ -0,0 +1,106 @@
+import re
+from typing import List
+
+from markupsafe import Markup
+
+from .css_inliner import COMPACT_EMAIL_CSS_PATH, compact_html, get_css_inliner, read_email_css
+from .models import EnrichedSection, ReportData
+from .report_generator import REPORT_TEMPLATES, TEAM_TABLE_TEMPLATES, report_template_context, template_registry
+
+# The serializer adds a newline after a block element with no trailing text, so
+# the fragment ends in a newline of our own, dropped again after inlining; the
+# markers keep the whitespace around the fragment exactly as rendered.
+_FRAGMENT = re.compile(r"<!--fragment-->(.*)\n<!--/fragment-->", re.DOTALL)
+_PLACEHOLDER = re.compile(r"<!--team-table:(\d+)-->")
+_TITLE = re.compile(r'<h1.*?>(.*?)</h1>', re.DOTALL)
+
+
+def _cap_rows(section: EnrichedSection, max_rows) -> EnrichedSection:
+    issues_by_team, remaining = [], max_rows
+    for team, issues in section.issues_by_team:
+        if remaining <= 0:
+            break
+        issues_by_team.append((team, issues[:remaining]))
+        remaining -= len(issues)
+    total = sum(len(issues) for _, issues in section.issues_by_team)
+    shown = sum(len(issues) for _, issues in issues_by_team)
+    return EnrichedSection(section.name, section.jql, issues_by_team, hidden_issues=total - shown)
+
+
+class ReportFragments:
+    """Email bodies for one report, assembled from team tables rendered and inlined once.
+
+    Each (section, team) table is rendered from its own template and run
+    through the CSS inliner the first time it is needed. The full email and
+    every per-team email are then assembled from those cached pieces. Only
+    the small frame around them (release info, section headings, legend) is
+    inlined per email.
+    """
+
+    def __init__(self, report_type, reports_data: List[ReportData], sla_config, jira_server_url, release_info,
+                 days_since_branch_cut, holidays, css_text=""):
+        self.inliner = get_css_inliner(css_text)
+        self.context = report_template_context(
+            report_type, reports_data, sla_config, jira_server_url, release_info, days_since_branch_cut, holidays
+        )
+        self._page_template = template_registry.get(REPORT_TEMPLATES[report_type])
+        self._team_table_template = template_registry.get(TEAM_TABLE_TEMPLATES[report_type])
+        self._inlined_tables = {}
+
+    @property
+    def sections(self) -> List[EnrichedSection]:
+        return self.context["reports_data"]
+
+    def teams(self):
+        teams = {}
+        for section in self.sections:
+            for team, _ in section.issues_by_team:
+                teams.setdefault(team, None)
+        return list(teams)
+
+    def inlined_team_table(self, section: EnrichedSection, team, issues):
+        key = (section.name, team)
+        inlined = self._inlined_tables.get(key)
+        if inlined is None:
+            html = self._team_table_template.render(self.context, report_data=section, team=team, issues=issues)
+            # The container wrapper lets ".container h3" style rules match inside the fragment.
+            document = self.inliner.transform(f'<div class="container"><!--fragment-->{html}\n<!--/fragment--></div>')
+            inlined = self._inlined_tables[key] = _FRAGMENT.search(document).group(1)
+        return inlined
+
+    def _sections_for(self, team=None) -> List[EnrichedSection]:
+        if team is None:
+            return self.sections
+        sections = [
+            EnrichedSection(section.name, section.jql, [(t, issues) for t, issues in section.issues_by_team if t == team])
+            for section in self.sections
+        ]
+        return [section for section in sections if section.issues_by_team]
+
+    def email_body(self, team=None, include_title=False):
+        sections = self._sections_for(team)
+        placed = []
+
+        def placeholder(section, team, issues):
+            placed.append((section, team, issues))
+            return Markup(f"<!--team-table:{len(placed) - 1}-->")
+
+        frame = self._page_template.render(self.context, reports_data=sections, team_tables=placeholder)
+        if not include_title:
+            frame = _TITLE.sub('', frame)
+        inlined_frame = self.inliner.transform(frame)
+        return _PLACEHOLDER.sub(lambda match: self.inlined_team_table(*placed[int(match.group(1))]), inlined_frame)
+
+    def compact_email_body(self, team=None, include_title=False, max_rows_per_section=None):
+        """Email body with a shared stylesheet instead of inlined styles, optionally capped in rows.
+
+        Sections longer than max_rows_per_section end with a link to the rest
+        of their issues in Jira.
+        """
+        sections = self._sections_for(team)
+        if max_rows_per_section and max_rows_per_section > 0:
+            sections = [_cap_rows(section, max_rows_per_section) for section in sections]
+        html = self._page_template.render(self.context, reports_data=sections)
+        if not include_title:
+            html = _TITLE.sub('', html)
+        return compact_html(html, read_email_css(COMPACT_EMAIL_CSS_PATH))
@@ -0,0 +1,202 @@
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import List
+
+from .business_calendar import get_calendar
+from .models import ReportData, StructuredReport
+from .sla_enrichment import DEFAULT_SLA_HOURS, NO_TEAM, _row_class
+
+# Every column a structured report row has, in row order, with its JSON type.
+REPORT_COLUMNS = (
+    ("key", "string"),
+    ("summary", "string"),
+    ("team", "string"),
+    ("assignee", "string"),
+    ("assignee_email", "string"),
+    ("reporter", "string"),
+    ("reporter_email", "string"),
+    ("priority", "string"),
+    ("status", "string"),
+    ("created", "datetime"),
+    ("resolution_date", "datetime"),
+    ("sla_hours", "number"),
+    ("time_in_status_hours", "number"),
+    ("time_to_assign_hours", "number"),
+    ("business_hours_open", "number"),
+    ("total_hours_open", "number"),
+    ("sla_status", "string"),
+    ("sla_state", "string"),
+    ("time_in_each_status", "object"),
+    ("root_cause", "string"),
+    ("rca_category", "string"),
+)
+COLUMN_TYPES = dict(REPORT_COLUMNS)
+COLUMN_POSITIONS = {name: position for position, (name, _) in enumerate(REPORT_COLUMNS)}
+# Columns that grow with the clock for unresolved issues.
+CLOCK_COLUMNS = ("time_in_status_hours", "business_hours_open", "total_hours_open", "time_in_each_status")
+_VERSIONED_POSITIONS = [position for name, position in COLUMN_POSITIONS.items() if name not in CLOCK_COLUMNS]
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+class StaleCursor(ValueError):
+    pass
+
+
+def _hours(value):
+    return None if value is None else round(float(value), 2)
+
+
+def _row(issue, team, end_date, business_hours_open, sla_config):
+    sla = sla_config.get(issue.priority, DEFAULT_SLA_HOURS)
+    time_in_status = issue.time_in_status
+    return (
+        issue.key,
+        issue.summary,
+        team,
+        issue.assignee,
+        issue.assignee_email,
+        issue.reporter,
+        issue.reporter_email,
+        issue.priority,
+        issue.status,
+        issue.created.isoformat(),
+        issue.resolution_date.isoformat() if issue.resolution_date else None,
+        sla,
+        _hours(time_in_status),
+        _hours(issue.time_to_assign),
+        _hours(business_hours_open),
+        _hours((end_date - issue.created).total_seconds() / 3600),
+        "Not Met" if time_in_status > sla else "Met",
+        _row_class(time_in_status, sla).removeprefix("sla-"),
+        {status: _hours(hours) for status, hours in issue.time_in_each_status.items()},
+        getattr(issue, 'root_cause', 'N/A'),
+        getattr(issue, 'rca_category', 'N/A'),
+    )
+
+
+def structured_report(reports_data: List[ReportData], sla_config, holidays, release_info=None,
+                      days_since_branch_cut=None, now=None) -> StructuredReport:
+    """Typed rows for every issue, grouped like the HTML report: by section, then team.
+
+    Values are the numbers and timestamps the HTML report formats for
+    display, with open issues' hours counted up to ``as_of``. The version is
+    a digest of the report without the clock columns: it changes when an
+    issue, its SLA state or the grouping does, not each time hours are
+    recounted, so cursors and ETags outlive a rebuild of the same data.
+    """
+    now = now or datetime.now(timezone.utc)
+    sla_config = sla_config or {}
+    issues = [issue for report_data in reports_data for issue in report_data.issues]
+    end_dates = [issue.resolution_date or now for issue in issues]
+    business_hours = get_calendar(holidays).business_hours_batch(
+        (issue.created, end_date) for issue, end_date in zip(issues, end_dates)
+    ).tolist()
+
+    position = 0
+    sections, rows = [], []
+    for report_data in reports_data:
+        rows_by_team = {}
+        for issue in report_data.issues:
+            team = issue.team or NO_TEAM
+            rows_by_team.setdefault(team, []).append(
+                _row(issue, team, end_dates[position], business_hours[position], sla_config)
+            )
+            position += 1
+        teams = []
+        for team, team_rows in sorted(rows_by_team.items(), key=lambda item: (item[0] == NO_TEAM, item[0])):
+            teams.append((team, len(rows), len(rows) + len(team_rows)))
+            rows.extend(team_rows)
+        sections.append((report_data.name, report_data.jql, teams))
+
+    digest = hashlib.blake2b(digest_size=12)
+    versioned_rows = [[row[position] for position in _VERSIONED_POSITIONS] for row in rows]
+    digest.update(json.dumps([sections, versioned_rows, str(days_since_branch_cut)], default=str).encode("utf-8"))
+    return StructuredReport(release_info, days_since_branch_cut, sections, rows, digest.hexdigest(), now.isoformat())
+
+
+def encode_cursor(version, offset):
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, version):
+    """The row offset a cursor points at. Raises StaleCursor when the report changed since it was issued."""
+    try:
+        cursor_version, offset = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii").split(":")
+        offset = int(offset)
+    except ValueError:
+        raise ValueError(f"Malformed cursor: {cursor!r}") from None
+    if cursor_version != version:
+        raise StaleCursor("The report changed since this cursor was issued; start again from the first page.")
+    if offset < 0:
+        raise ValueError(f"Malformed cursor: {cursor!r}")
+    return offset
+
+
+def page_columns(columns=None):
+    """Validated column names, all of them when columns is empty."""
+    if not columns:
+        return [name for name, _ in REPORT_COLUMNS]
+    unknown = [name for name in columns if name not in COLUMN_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}. Expected any of {', '.join(COLUMN_TYPES)}.")
+    return list(dict.fromkeys(columns))
+
+
+def page_etag(report: StructuredReport, columns, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    # Identifies one page of one report version without building it. Weak,
+    # since the version leaves out the clock columns: pages with one tag
+    # agree on their issues and SLA states but may differ in hours and as_of.
+    digest = hashlib.blake2b(f"{report.version}|{','.join(columns)}|{cursor or ''}|{limit}".encode("utf-8"), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def report_page(report: StructuredReport, columns, cursor=None, limit=DEFAULT_PAGE_SIZE) -> dict:
+    """One page of rows, starting at cursor, split into runs of one section and team.
+
+    Every page carries the section and team totals, so a client can size a
+    virtualized table from the first page and fetch the rest on demand by
+    following next_cursor.
+    """
+    offset = decode_cursor(cursor, report.version) if cursor else 0
+    end = min(offset + max(1, min(limit, MAX_PAGE_SIZE)), len(report.rows))
+    positions = [COLUMN_POSITIONS[name] for name in columns]
+
+    groups = []
+    for name, _, teams in report.sections:
+        for team, first, last in teams:
+            start, stop = max(first, offset), min(last, end)
+            if start < stop:
+                groups.append({
+                    "section": name,
+                    "team": team,
+                    "offset": start - first,
+                    "rows": [[row[position] for position in positions] for row in report.rows[start:stop]],
+                })
+
+    release_info = report.release_info
+    return {
+        "version": report.version,
+        "as_of": report.as_of,
+        "release": {
+            "release_version": release_info.release_version,
+            "branch_cut_date": release_info.branch_cut_date,
+            "team_name": release_info.team_name,
+        } if release_info else None,
+        "days_since_branch_cut": report.days_since_branch_cut,
+        "columns": [{"name": name, "type": COLUMN_TYPES[name]} for name in columns],
+        "sections": [
+            {
+                "name": name,
+                "jql": jql,
+                "issues": sum(last - first for _, first, last in teams),
+                "teams": [{"team": team, "issues": last - first} for team, first, last in teams],
+            }
+            for name, jql, teams in report.sections
+        ],
+        "total_rows": len(report.rows),
+        "groups": groups,
+        "next_cursor": encode_cursor(report.version, end) if end < len(report.rows) else None,
+    }
@@ -1,18 +1,33 @@
 import os
 from .config import Config, load_release_config, get_release_info
-from .jira_client import SlaJiraClient
+from .jira_client import SlaJiraClient, REPORT_FIELDS, compute_sla_metrics
+from .issue_records import record_timeline
+from .business_calendar import get_calendar
+from .query_planner import FieldResolver, QueryPlan, UnsupportedJql, plan_sections, plan_against_base
+from .issue_store import get_issue_store
+from .report_cache import get_report_cache, get_report_page_cache, report_cache_key
+from .release_dataset import ReleaseDataset, get_release_datasets
 from .report_generator import (
     generate_all_issues_report,
     generate_open_issues_report,
     generate_excel_report,
+    render_report_section,
+    stream_report,
 )
 from .email_report import send_email
 from .logger import logger
+import asyncio
 import concurrent.futures
+from contextlib import nullcontext
+from functools import partial
 from datetime import datetime, date, timedelta
-from .models import ReportData, IssueDetails
+from .models import CachedReport, ReportData, IssueDetails, IssueRecord, StructuredReport
+from .columnar_report import ColumnarReportData, IssueTable
 from typing import List
-from premailer import Premailer
+from .report_fragments import ReportFragments
+from .css_inliner import read_email_css
+from .report_export import export_report
+from .report_json import structured_report
 from pathlib import Path
 import re
 from ..credentials import Credentials
@@ -20,34 +35,43 @@ import pandas as pd
 
 
 class Reporter:
-    def __init__(self, config_path="config/regression_config.yaml", output_path="sla_report.html"):
+    def __init__(self, config_path="config/regression_config.yaml", output_path="sla_report.html", jira_pool=None):
+        self.config_path = config_path
         self.config = Config(config_path)
         self.output_path = output_path
         self.main_config = Config("config/config.yaml")
         self.releases, self.teams = load_release_config()
         self.release_info = None
         self.jira_client = None
+        self.jira_pool = jira_pool
+        self.issue_store = get_issue_store(self.main_config.get("issue_store"))
+        self.report_cache = get_report_cache(self.main_config.get("report_cache"))
+        self.report_pages = get_report_page_cache(self.main_config.get("report_pages"))
+        self.release_datasets = get_release_datasets(self.main_config.get("release_dataset"))
+        self.columnar_reports = self.main_config.get("report_data_backend", "objects") == "columnar"
         self.credentials = Credentials()
+        # Set for background jobs: called as progress(event, data) while a report is built.
+        self.progress = None
+        self.progress_report_type = None
 
     def run_cli(self):
         logger.info("Starting SLA report generation for CLI.")
         report_type = self.config.get("report_type", "regression")
         release_version = self.config.get("fix_version")
-        html_report, reports_data, days_since_branch_cut = self._generate_report_data(release_version, report_type, "All", [], [])
+        report_chunks, reports_data, days_since_branch_cut = self._generate_report_data(release_version, report_type, "All", [], [], stream=True)
 
-        with open(self.output_path, "w") as f:
-            f.write(html_report)
+        self._write_report(report_chunks, self.output_path)
         logger.info(f"Report saved to {self.output_path}")
 
         if report_type == "post_release_metrics":
             excel_path = self.output_path.replace(".html", ".xlsx")
             generate_excel_report(reports_data, excel_path)
+            self._export_additional_formats(reports_data, Path("reports") / excel_path)
             attachment_path = excel_path
         else:
             attachment_path = None
 
         self._send_email_report(
-            html_report,
             report_type,
             days_since_branch_cut,
             release_version,
@@ -58,14 +82,118 @@ class Reporter:
 
         logger.info("SLA report generation complete.")
 
-    def run_webapp(self, release_version: str, report_type: str, selected_team: str, selected_statuses: List[str], selected_priorities: List[str], selected_severities: List[str], selected_platforms: List[str], email_recipients: List[str], include_assignees_in_email_report: bool = False, include_reportees_in_email_report: bool = False, include_app_leadership: bool = False, include_regression_team: bool = False, include_tech_leads: bool = False, include_scrum_masters: bool = False, include_all_app_teams: bool = False, send_per_team_emails: bool = False, send_email_report: bool = False):
+    def run_webapp(self, release_version: str, report_type: str, selected_team: str, selected_statuses: List[str], selected_priorities: List[str], selected_severities: List[str], selected_platforms: List[str], email_recipients: List[str], include_assignees_in_email_report: bool = False, include_reportees_in_email_report: bool = False, include_app_leadership: bool = False, include_regression_team: bool = False, include_tech_leads: bool = False, include_scrum_masters: bool = False, include_all_app_teams: bool = False, send_per_team_emails: bool = False, send_email_report: bool = False, progress=None):
         logger.info(f"Starting SLA report generation for webapp for release {release_version}.")
+        self.progress, self.progress_report_type = progress, report_type
+        self._report_progress("stage", {"stage": "fetching"})
         html_report, reports_data, days_since_branch_cut = self._generate_report_data(release_version, report_type, selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms)
+        self._report_progress("stage", {"stage": "publishing"})
+        return self._publish_webapp_report(
+            html_report,
+            reports_data,
+            days_since_branch_cut,
+            release_version,
+            report_type,
+            email_recipients,
+            send_email_report,
+            include_assignees_in_email_report=include_assignees_in_email_report,
+            include_reportees_in_email_report=include_reportees_in_email_report,
+            include_app_leadership=include_app_leadership,
+            include_regression_team=include_regression_team,
+            include_tech_leads=include_tech_leads,
+            include_scrum_masters=include_scrum_masters,
+            include_all_app_teams=include_all_app_teams,
+            send_per_team_emails=send_per_team_emails,
+        )
+
+    async def run_webapp_async(self, async_jira, release_version: str, report_type: str, selected_team: str, selected_statuses: List[str], selected_priorities: List[str], selected_severities: List[str], selected_platforms: List[str], email_recipients: List[str], include_assignees_in_email_report: bool = False, include_reportees_in_email_report: bool = False, include_app_leadership: bool = False, include_regression_team: bool = False, include_tech_leads: bool = False, include_scrum_masters: bool = False, include_all_app_teams: bool = False, send_per_team_emails: bool = False, send_email_report: bool = False):
+        email_options = dict(
+            include_assignees_in_email_report=include_assignees_in_email_report,
+            include_reportees_in_email_report=include_reportees_in_email_report,
+            include_app_leadership=include_app_leadership,
+            include_regression_team=include_regression_team,
+            include_tech_leads=include_tech_leads,
+            include_scrum_masters=include_scrum_masters,
+            include_all_app_teams=include_all_app_teams,
+            send_per_team_emails=send_per_team_emails,
+        )
+        if self.issue_store or async_jira is None:
+            # The issue store syncs through the blocking client.
+            return await asyncio.to_thread(
+                self.run_webapp, release_version, report_type, selected_team, selected_statuses, selected_priorities,
+                selected_severities, selected_platforms, email_recipients, send_email_report=send_email_report, **email_options
+            )
+
+        logger.info(f"Starting SLA report generation for webapp for release {release_version}.")
+        html_report, reports_data, days_since_branch_cut = await self._generate_report_data_async(async_jira, release_version, report_type, selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms)
+        # Spreadsheet writing and SMTP are blocking; keep them off the event loop.
+        return await asyncio.to_thread(
+            self._publish_webapp_report, html_report, reports_data, days_since_branch_cut, release_version,
+            report_type, email_recipients, send_email_report, **email_options
+        )
+
+    async def stream_webapp_async(self, async_jira, release_version: str, report_type: str, selected_team: str, selected_statuses: List[str], selected_priorities: List[str], selected_severities: List[str], selected_platforms: List[str], email_recipients: List[str], include_assignees_in_email_report: bool = False, include_reportees_in_email_report: bool = False, include_app_leadership: bool = False, include_regression_team: bool = False, include_tech_leads: bool = False, include_scrum_masters: bool = False, include_all_app_teams: bool = False, send_per_team_emails: bool = False, send_email_report: bool = False):
+        """Like run_webapp_async, but returns the report as an iterator of HTML chunks.
+
+        Jira is queried before this returns. Rendering, the spreadsheet and
+        the email happen while the caller consumes the iterator.
+        """
+        logger.info(f"Starting streamed SLA report generation for webapp for release {release_version}.")
+        if self.issue_store or async_jira is None:
+            report_chunks, reports_data, days_since_branch_cut = await asyncio.to_thread(
+                self._generate_report_data, release_version, report_type, selected_team, selected_statuses,
+                selected_priorities, selected_severities, selected_platforms, stream=True
+            )
+        else:
+            report_chunks, reports_data, days_since_branch_cut = await self._generate_report_data_async(
+                async_jira, release_version, report_type, selected_team, selected_statuses, selected_priorities,
+                selected_severities, selected_platforms, stream=True
+            )
+        return self._publish_streamed_report(
+            report_chunks,
+            reports_data,
+            days_since_branch_cut,
+            release_version,
+            report_type,
+            email_recipients,
+            send_email_report,
+            include_assignees_in_email_report=include_assignees_in_email_report,
+            include_reportees_in_email_report=include_reportees_in_email_report,
+            include_app_leadership=include_app_leadership,
+            include_regression_team=include_regression_team,
+            include_tech_leads=include_tech_leads,
+            include_scrum_masters=include_scrum_masters,
+            include_all_app_teams=include_all_app_teams,
+            send_per_team_emails=send_per_team_emails,
+        )
+
+    def _publish_streamed_report(self, report_chunks, reports_data, days_since_branch_cut, release_version, report_type, email_recipients: List[str], send_email_report: bool = False, **email_options):
+        # Email bodies are assembled from report fragments, so no chunk is kept.
+        yield from report_chunks
+        if reports_data is None:
+            return
+        self._publish_webapp_report(
+            None, reports_data, days_since_branch_cut, release_version, report_type,
+            email_recipients, send_email_report, **email_options
+        )
+
+    def _export_additional_formats(self, reports_data, excel_path):
+        # The xlsx export is always written; other formats go next to it under the same name.
+        for export_format in self.main_config.get("run_settings", {}).get("report_export_formats") or []:
+            if export_format != "xlsx":
+                export_report(reports_data, Path(excel_path).with_suffix(f".{export_format}"), export_format)
+
+    def _write_report(self, report_chunks, output_path):
+        with open(output_path, "w") as f:
+            for chunk in report_chunks:
+                f.write(chunk)
 
+    def _publish_webapp_report(self, html_report, reports_data, days_since_branch_cut, release_version, report_type, email_recipients: List[str], send_email_report: bool = False, include_assignees_in_email_report: bool = False, include_reportees_in_email_report: bool = False, include_app_leadership: bool = False, include_regression_team: bool = False, include_tech_leads: bool = False, include_scrum_masters: bool = False, include_all_app_teams: bool = False, send_per_team_emails: bool = False):
         if report_type == "open_issues" or report_type == "all_issues":
             excel_filename = "sla_report.xlsx"
             excel_path = Path("reports") / excel_filename
             generate_excel_report(reports_data, excel_filename)
+            self._export_additional_formats(reports_data, excel_path)
             attachment_path = excel_path
         else:
             attachment_path = None
@@ -73,7 +201,6 @@ class Reporter:
         if send_email_report and email_recipients:
             if attachment_path:
                 self._send_email_report(
-                    html_report,
                     report_type,
                     days_since_branch_cut,
                     release_version,
@@ -86,10 +213,11 @@ class Reporter:
                     include_regression_team=include_regression_team,
                     include_tech_leads=include_tech_leads,
                     include_scrum_masters=include_scrum_masters,
+                    include_all_app_teams=include_all_app_teams,
+                    send_per_team_emails=send_per_team_emails,
                 )
             else:
                 self._send_email_report(
-                    html_report,
                     report_type,
                     days_since_branch_cut,
                     release_version,
@@ -101,6 +229,8 @@ class Reporter:
                     include_regression_team=include_regression_team,
                     include_tech_leads=include_tech_leads,
                     include_scrum_masters=include_scrum_masters,
+                    include_all_app_teams=include_all_app_teams,
+                    send_per_team_emails=send_per_team_emails,
                 )
 
         return html_report
@@ -117,18 +247,48 @@ class Reporter:
             current_date += timedelta(days=1)
         return business_days
 
-    def _generate_report_data(self, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = []):
+    def _report_progress(self, event, data):
+        if self.progress is None:
+            return
+        try:
+            self.progress(event, data)
+        except Exception as e:
+            logger.error(f"Failed to report {event} progress: {e}")
+
+    def _report_sections_ready(self, sections: List[ReportData], report_order):
+        if self.progress is None:
+            return
+        for section in sections:
+            try:
+                html = render_report_section(
+                    self.progress_report_type, section, self.config.get("sla"), self.main_config.get("jira")["server"],
+                    self.release_info, self._holidays(),
+                )
+            except Exception as e:
+                logger.error(f"Failed to render section {section.name} for progress: {e}")
+                continue
+            self._report_progress("section", {
+                "name": section.name,
+                "position": report_order[section.name],
+                "issues": len(section.issues),
+                "html": html,
+            })
+
+    def _jira_client_lease(self, holidays):
+        if self.jira_pool:
+            return self.jira_pool.lease(holidays)
+        logger.info("Initializing Jira client...")
+        return nullcontext(SlaJiraClient(credentials=self.credentials, holidays=holidays))
+
+    def _report_context(self, release_version: str, report_type: str, selected_platforms: List[str] = []):
         self.release_info = get_release_info(self.releases, self.teams, release_version)
 
         if not self.release_info:
-            error_message = f"Release '{release_version}' not found in release config."
-            logger.error(error_message)
-            return f"<h1>{error_message}</h1>", None, None
+            return None
 
         branch_cut_date_str = self.release_info.branch_cut_date
         days_since_branch_cut = None
-        holidays_str = self.config.get("us_holidays", [])
-        holidays = [datetime.strptime(h, "%Y-%m-%d").date() for h in holidays_str]
+        holidays = self._holidays()
         if branch_cut_date_str:
             branch_cut_date = datetime.strptime(branch_cut_date_str, "%Y-%m-%d").date()
             if branch_cut_date > date.today():
@@ -141,28 +301,174 @@ class Reporter:
                 f"Unknown report type: '{report_type}'. Available types are 'all_issues' and 'open_issues'."
             )
 
-        logger.info("Initializing Jira client...")
-        self.jira_client = SlaJiraClient(credentials=self.credentials, holidays=set(holidays))
-        jira_server_url = self.jira_client.jira_config["server"]
-
         reports_config = self.config.get("reports", [])
 
         if selected_platforms and "All" not in selected_platforms:
             reports_config = [report for report in reports_config if report["name"] in selected_platforms]
+        return reports_config, holidays, days_since_branch_cut
 
-        if report_type == "all_issues":
-            reports_data = self._process_all_issues_reports(reports_config, release_version, selected_statuses)
-        elif report_type == "open_issues":
-            reports_data = self._process_open_issues_reports(reports_config, release_version, selected_statuses)
+    def _holidays(self):
+        holidays_str = self.config.get("us_holidays", [])
+        return [datetime.strptime(h, "%Y-%m-%d").date() for h in holidays_str]
+
+    def _release_not_found(self, release_version):
+        error_message = f"Release '{release_version}' not found in release config."
+        logger.error(error_message)
+        return f"<h1>{error_message}</h1>", None, None
+
+    def _release_not_found_report(self, release_version, stream=False):
+        html_report, reports_data, days_since_branch_cut = self._release_not_found(release_version)
+        return ([html_report] if stream else html_report), reports_data, days_since_branch_cut
+
+    def _from_cached_report(self, cached: CachedReport):
+        self.release_info = cached.release_info
+        return cached.html, cached.reports_data, cached.days_since_branch_cut
+
+    def _generate_report_data(self, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = [], stream: bool = False):
+        filters = (selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms)
+        # Cached results hold the whole rendered report, so streamed reports skip the cache
+        # to keep their chunks coming as they render.
+        if self.report_cache is None or stream:
+            return self._fetch_report_results(release_version, report_type, *filters, stream=stream)
+
+        def compute():
+            html_report, reports_data, days_since_branch_cut = self._fetch_report_results(release_version, report_type, *filters)
+            return CachedReport(html_report, reports_data, days_since_branch_cut, self.release_info)
+
+        cached = self.report_cache.get_or_compute(
+            report_cache_key(release_version, report_type, *filters),
+            compute,
+            cacheable=lambda cached: cached.reports_data is not None,
+        )
+        return self._from_cached_report(cached)
+
+    async def _generate_report_data_async(self, async_jira, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = [], stream: bool = False):
+        filters = (selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms)
+        if self.report_cache is None or stream:
+            return await self._fetch_report_results_async(async_jira, release_version, report_type, *filters, stream=stream)
+
+        async def compute():
+            html_report, reports_data, days_since_branch_cut = await self._fetch_report_results_async(
+                async_jira, release_version, report_type, *filters
+            )
+            return CachedReport(html_report, reports_data, days_since_branch_cut, self.release_info)
+
+        cached = await self.report_cache.get_or_compute_async(
+            report_cache_key(release_version, report_type, *filters),
+            compute,
+            cacheable=lambda cached: cached.reports_data is not None,
+        )
+        return self._from_cached_report(cached)
+
+    def _structured_report(self, release_version, fetched):
+        if fetched is None:
+            self._release_not_found(release_version)
+            return None
+        reports_data, holidays, days_since_branch_cut, _ = fetched
+        return structured_report(reports_data, self.config.get("sla"), holidays, self.release_info, days_since_branch_cut)
+
+    def structured_report(self, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = [], refresh: bool = False) -> StructuredReport:
+        """The report as typed rows for the JSON API, or None for an unknown release.
+
+        The built report is kept in report_pages so later pages and
+        revalidations read it; refresh rebuilds it unless the report cache
+        is on, in which case identical requests share it as HTML reports do.
+        """
+        filters = (selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms)
+        key = ("structured",) + report_cache_key(release_version, report_type, *filters)
+
+        def compute():
+            return self._structured_report(release_version, self._fetch_reports_data(release_version, report_type, *filters))
+
+        if refresh and self.report_cache is None:
+            report = compute()
+            if report is not None:
+                self.report_pages.put(key, report)
+            return report
+        return self.report_pages.get_or_compute(key, compute, cacheable=lambda report: report is not None)
+
+    async def structured_report_async(self, async_jira, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = [], refresh: bool = False) -> StructuredReport:
+        filters = (selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms)
+        if self.issue_store or async_jira is None:
+            # The issue store syncs through the blocking client.
+            return await asyncio.to_thread(self.structured_report, release_version, report_type, *filters, refresh=refresh)
+        key = ("structured",) + report_cache_key(release_version, report_type, *filters)
+
+        async def compute():
+            fetched = await self._fetch_reports_data_async(async_jira, release_version, report_type, *filters)
+            return await asyncio.to_thread(self._structured_report, release_version, fetched)
+
+        if refresh and self.report_cache is None:
+            report = await compute()
+            if report is not None:
+                self.report_pages.put(key, report)
+            return report
+        return await self.report_pages.get_or_compute_async(key, compute, cacheable=lambda report: report is not None)
+
+    def _fetch_reports_data(self, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = []):
+        # (reports_data, holidays, days_since_branch_cut, jira_server_url), or None for an unknown release.
+        context = self._report_context(release_version, report_type, selected_platforms)
+        if context is None:
+            return None
+        reports_config, holidays, days_since_branch_cut = context
+
+        reports_data = self._dataset_reports(
+            reports_config, release_version, selected_team, selected_statuses, selected_priorities, selected_severities
+        )
+        if reports_data is not None:
+            jira_server_url = self.main_config.get("jira")["server"]
+        else:
+            with self._jira_client_lease(set(holidays)) as self.jira_client:
+                jira_server_url = self.jira_client.jira_config["server"]
+                if report_type == "all_issues":
+                    reports_data = self._process_all_issues_reports(reports_config, release_version, selected_statuses, selected_team, selected_priorities, selected_severities)
+                elif report_type == "open_issues":
+                    reports_data = self._process_open_issues_reports(reports_config, release_version, selected_statuses, selected_team, selected_priorities, selected_severities)
 
-        if selected_team != "All":
-            for report_data in reports_data:
-                report_data.issues = [issue for issue in report_data.issues if issue.team == selected_team]
-        
         logger.debug(f"Reports data fetched: {reports_data}")
-        
-        html_report = self._generate_report(reports_data, report_type, jira_server_url, days_since_branch_cut, release_version, holidays)
+        return reports_data, holidays, days_since_branch_cut, jira_server_url
+
+    def _fetch_report_results(self, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = [], stream: bool = False):
+        fetched = self._fetch_reports_data(
+            release_version, report_type, selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms
+        )
+        if fetched is None:
+            return self._release_not_found_report(release_version, stream)
+        reports_data, holidays, days_since_branch_cut, jira_server_url = fetched
+        self._report_progress("stage", {"stage": "rendering"})
 
+        html_report = self._generate_report(reports_data, report_type, jira_server_url, days_since_branch_cut, release_version, holidays, stream)
+
+        return html_report, reports_data, days_since_branch_cut
+
+    async def _fetch_reports_data_async(self, async_jira, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = []):
+        context = self._report_context(release_version, report_type, selected_platforms)
+        if context is None:
+            return None
+        reports_config, holidays, days_since_branch_cut = context
+
+        reports_data = await asyncio.to_thread(
+            self._dataset_reports,
+            reports_config, release_version, selected_team, selected_statuses, selected_priorities, selected_severities,
+        )
+        if reports_data is None:
+            reports_data = await self._fetch_reports_async(
+                async_jira, reports_config, release_version, get_calendar(holidays), selected_statuses, selected_team,
+                selected_priorities, selected_severities,
+            )
+        logger.debug(f"Reports data fetched: {reports_data}")
+        return reports_data, holidays, days_since_branch_cut, self.main_config.get("jira")["server"]
+
+    async def _fetch_report_results_async(self, async_jira, release_version: str, report_type: str, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_platforms: List[str] = [], stream: bool = False):
+        fetched = await self._fetch_reports_data_async(
+            async_jira, release_version, report_type, selected_team, selected_statuses, selected_priorities, selected_severities, selected_platforms
+        )
+        if fetched is None:
+            return self._release_not_found_report(release_version, stream)
+        reports_data, holidays, days_since_branch_cut, jira_server_url = fetched
+        html_report = await asyncio.to_thread(
+            self._generate_report, reports_data, report_type, jira_server_url, days_since_branch_cut, release_version, holidays, stream
+        )
         return html_report, reports_data, days_since_branch_cut
 
     def _generate_report(
@@ -173,9 +479,21 @@ class Reporter:
         days_since_branch_cut,
         release_version,
         holidays,
+        stream=False,
     ):
         logger.info("Generating HTML report...")
 
+        if stream:
+            return stream_report(
+                report_type,
+                reports_data,
+                self.config.get("sla"),
+                jira_server_url,
+                self.release_info,
+                days_since_branch_cut,
+                holidays,
+            )
+
         if report_type == "all_issues":
             sla_config = self.config.get("sla")
             html_report = generate_all_issues_report(
@@ -204,12 +522,10 @@ class Reporter:
         logger.debug(f"Generated HTML report (first 500 chars): {html_report[:500]}")
         return html_report
 
-    def _fetch_report_data(self, report_config, release_version, selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = []) -> ReportData:
-        logger.info(f"Fetching issues for report: {report_config['name']}")
-        project = self.config.get("project") # Get project from config
+    def _build_report_jql(self, report_config, release_version, selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = []) -> str:
         jql_templates = self.config.get("jql_templates")
 
-        base_jql = jql_templates["base_jql_template"].format(fix_version=release_version, project=project)
+        base_jql = self._release_jql(release_version)
         
         # Build dynamic JQL based on report_config parameters
         final_jql = base_jql
@@ -260,99 +576,312 @@ class Reporter:
             final_jql += f" AND Severity in ({severity_jql})"
 
         logger.debug(f"Final JQL: {final_jql}")
-        issues = self.jira_client.search_issues(final_jql)
+        return final_jql
 
+    def _fetch_issue_details(self, jql, selected_team: str = "All", extra_fields=()):
+        # With a team filter most issues are dropped, so changelogs are only
+        # fetched for the issues that survive it.
+        lazy_changelog = selected_team != "All"
+        issues = self.jira_client.search_records(
+            jql, extra_fields=extra_fields, expand=None if lazy_changelog else "changelog"
+        )
+        return self._build_issue_details(issues, selected_team, lazy_changelog)
+
+    def _parent_keys_to_resolve(self, issues):
+        return {issue.parent_key for issue in issues if not issue.epic_link and issue.parent_key}
+
+    def _assign_teams(self, issues, parent_epic_links, selected_team: str = "All"):
         epic_to_team_mapping = {}
         for team_info in self.teams:
             for epic in team_info.get("regression_epics", []):
                 epic_to_team_mapping[epic] = team_info["team_name"]
 
-        issue_details = []
+        issue_teams = []
         for issue in issues:
             team = "Uncategorized"
-            epic_key = getattr(issue.fields, 'customfield_10014', None)
-            if not epic_key and hasattr(issue.fields, 'parent'):
-                try:
-                    parent_issue = self.jira_client.issue(issue.fields.parent.key)
-                    epic_key = getattr(parent_issue.fields, 'customfield_10014', None)
-                except Exception as e:
-                    logger.warning(f"Could not fetch parent issue for {issue.key}: {e}")
+            epic_key = issue.epic_link
+            if not epic_key and issue.parent_key:
+                epic_key = parent_epic_links.get(issue.parent_key)
 
             if epic_key and epic_key in epic_to_team_mapping:
                 team = epic_to_team_mapping[epic_key]
+            issue_teams.append(team)
 
+        if selected_team != "All":
+            kept = [(issue, team) for issue, team in zip(issues, issue_teams) if team == selected_team]
+            issues = [issue for issue, _ in kept]
+            issue_teams = [team for _, team in kept]
+        return issues, issue_teams
+
+    def _issue_details(self, issues: List[IssueRecord], issue_teams, calendar):
+        # One changelog pass per issue, then business hours for every issue and
+        # transition in one batch.
+        timelines = [record_timeline(issue) for issue in issues]
+        sla_metrics = compute_sla_metrics(calendar, timelines)
+        if self.columnar_reports:
+            return IssueTable.from_records(issues, issue_teams, timelines, sla_metrics)
+
+        issue_details = []
+        for issue, team, timeline, metrics in zip(issues, issue_teams, timelines, sla_metrics):
             issue_details.append(
                 IssueDetails(
                     key=issue.key,
-                    summary=issue.fields.summary,
-                    assignee=issue.fields.assignee.displayName if issue.fields.assignee else 'Unassigned',
-                    assignee_email=issue.fields.assignee.emailAddress if issue.fields.assignee else '',
-                    reporter=issue.fields.reporter.displayName if issue.fields.reporter else 'N/A',
-                    reporter_email=issue.fields.reporter.emailAddress if issue.fields.reporter else '',
-                    priority=issue.fields.priority.name,
-                    status=issue.fields.status.name,
-                    time_in_status=self.jira_client.get_time_in_current_status(issue),
-                    time_to_assign=self.jira_client.get_time_to_assign(issue),
-                    time_in_each_status=self.jira_client.get_time_in_each_status(issue),
-                    created=datetime.strptime(issue.fields.created, "%Y-%m-%dT%H:%M:%S.%f%z"),
-                    resolution_date=datetime.strptime(issue.fields.resolutiondate, "%Y-%m-%dT%H:%M:%S.%f%z") if issue.fields.resolutiondate else None,
+                    summary=issue.summary,
+                    assignee=issue.assignee if issue.assignee is not None else 'Unassigned',
+                    assignee_email=issue.assignee_email,
+                    reporter=issue.reporter if issue.reporter is not None else 'N/A',
+                    reporter_email=issue.reporter_email,
+                    priority=issue.priority,
+                    status=issue.status,
+                    time_in_status=metrics.time_in_status,
+                    time_to_assign=metrics.time_to_assign,
+                    time_in_each_status=metrics.time_in_each_status,
+                    created=timeline.created,
+                    resolution_date=timeline.resolution_date,
                     team=team,
                 )
             )
+        return issue_details
+
+    def _report_data(self, name, jql, issue_details, rows=None):
+        # issue_details is either a list of IssueDetails or, with the columnar
+        # backend, an IssueTable; rows picks a section out of it.
+        if isinstance(issue_details, IssueTable):
+            return ColumnarReportData(name, jql, issue_details, rows)
+        if rows is not None:
+            issue_details = [issue_details[row] for row in rows]
+        return ReportData(name=name, jql=jql, issues=issue_details)
+
+    def _partition_sections(self, plan: QueryPlan, issues, issue_details) -> List[ReportData]:
+        return [
+            self._report_data(
+                section.report_config["name"],
+                section.jql,
+                issue_details,
+                [row for row, issue in enumerate(issues) if section.predicate(issue)],
+            )
+            for section in plan.partitioned
+        ]
+
+    def _build_issue_details(self, issues, selected_team: str = "All", lazy_changelog: bool = False):
+        parent_keys = self._parent_keys_to_resolve(issues)
+        parent_epic_links = self.jira_client.resolve_parent_epics(parent_keys) if parent_keys else {}
+        issues, issue_teams = self._assign_teams(issues, parent_epic_links, selected_team)
+        if lazy_changelog:
+            self.jira_client.fetch_record_changelogs(issues)
+        else:
+            self.jira_client.complete_record_changelogs(issues)
+        return issues, self._issue_details(issues, issue_teams, self.jira_client.calendar)
+
+    def _fetch_report_data(self, report_config, release_version, selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = [], selected_team: str = "All") -> ReportData:
+        logger.info(f"Fetching issues for report: {report_config['name']}")
+        final_jql = self._build_report_jql(report_config, release_version, selected_statuses, selected_priorities, selected_severities)
+        _, issue_details = self._fetch_issue_details(final_jql, selected_team)
+        return self._report_data(report_config["name"], final_jql, issue_details)
 
-        return ReportData(
-            name=report_config["name"],
-            jql=jql,
-            issues=issue_details,
+    def _fetch_partitioned_reports(self, plan: QueryPlan, selected_team: str = "All") -> List[ReportData]:
+        # One superset search for every section that shares it, split locally.
+        logger.info(
+            f"Fetching {len(plan.partitioned)} report sections with one superset query: {plan.superset_jql}"
         )
+        issues, issue_details = self._fetch_issue_details(plan.superset_jql, selected_team, extra_fields=plan.fields)
+        return self._partition_sections(plan, issues, issue_details)
+
+    def _release_jql(self, release_version):
+        jql_templates = self.config.get("jql_templates")
+        return jql_templates["base_jql_template"].format(fix_version=release_version, project=self.config.get("project"))
 
-    
+    def _severity_field(self):
+        try:
+            return FieldResolver().resolve("Severity")
+        except UnsupportedJql as e:
+            logger.warning(f"Cannot filter by severity: {e}")
+            return None
 
-    def _process_all_issues_reports(self, reports, release_version, selected_statuses: List[str] = []):
+    def _store_fields(self, release_version):
+        # Every field any configured section or the severity filter reads, whatever
+        # this request selects, so no stored issue lacks a field a later request needs.
+        reports = self.config.get("reports", [])
+        section_jqls = {report_config["name"]: self._build_report_jql(report_config, release_version) for report_config in reports}
+        fields = REPORT_FIELDS + [
+            f for f in plan_against_base(section_jqls, reports, self._release_jql(release_version)).fields if f not in REPORT_FIELDS
+        ]
+        severity_field = self._severity_field()
+        if severity_field and severity_field not in fields:
+            fields.append(severity_field)
+        return fields
+
+    def _fetch_stored_reports(self, plan: QueryPlan, release_version, selected_team: str = "All") -> List[ReportData]:
+        # Bring the local store up to date, then answer every section from it.
+        try:
+            self.issue_store.sync_release(
+                self.jira_client, release_version, plan.superset_jql, self._store_fields(release_version)
+            )
+        except Exception as e:
+            logger.error(f"Issue store sync failed for {release_version}, querying Jira directly: {e}")
+            return self._fetch_partitioned_reports(plan, selected_team)
+        issues = self.issue_store.load_release(release_version, plan.fields)
+        logger.info(f"Loaded {len(issues)} stored issues for {release_version}")
+        issues, issue_details = self._build_issue_details(issues, selected_team)
+        return self._partition_sections(plan, issues, issue_details)
+
+    def _fetch_reports(self, reports, release_version, selected_statuses: List[str] = [], selected_team: str = "All", selected_priorities: List[str] = [], selected_severities: List[str] = []):
+        section_jqls = {
+            report_config["name"]: self._build_report_jql(report_config, release_version, selected_statuses, selected_priorities, selected_severities)
+            for report_config in reports
+        }
+        if self.issue_store:
+            plan = plan_against_base(section_jqls, reports, self._release_jql(release_version))
+            fetch_partitioned = partial(self._fetch_stored_reports, plan, release_version, selected_team)
+        else:
+            plan = plan_sections(section_jqls, reports)
+            fetch_partitioned = partial(self._fetch_partitioned_reports, plan, selected_team)
+
+        report_order = {report_config["name"]: index for index, report_config in enumerate(reports)}
         reports_data = []
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_report = {
+            future_to_sections = {
                 executor.submit(
-                    self._fetch_report_data, # Changed from _fetch_report_data
-                    report_config,
+                    self._fetch_report_data,
+                    section.report_config,
                     release_version,
                     selected_statuses,
-                ): report_config
-                for report_config in reports
+                    selected_priorities,
+                    selected_severities,
+                    selected_team=selected_team,
+                ): [section.report_config]
+                for section in plan.standalone
             }
-            for future in concurrent.futures.as_completed(future_to_report):
-                report_config = future_to_report[future]
+            if plan.partitioned:
+                future = executor.submit(fetch_partitioned)
+                future_to_sections[future] = [section.report_config for section in plan.partitioned]
+            for future in concurrent.futures.as_completed(future_to_sections):
+                report_configs = future_to_sections[future]
                 try:
                     data = future.result()
-                    reports_data.append(data)
                 except Exception as exc:
-                    logger.error(f"{report_config['name']} generated an exception: {exc}")
+                    for report_config in report_configs:
+                        logger.error(f"{report_config['name']} generated an exception: {exc}")
+                    continue
+                sections = data if isinstance(data, list) else [data]
+                reports_data.extend(sections)
+                self._report_sections_ready(sections, report_order)
+
+        reports_data.sort(key=lambda report_data: report_order[report_data.name])
         return reports_data
 
-    def _process_open_issues_reports(self, reports, release_version, selected_statuses: List[str] = []):
+    async def _fetch_issue_details_async(self, async_jira, jql, calendar, selected_team: str = "All", extra_fields=()):
+        lazy_changelog = selected_team != "All"
+        issues = await async_jira.search_records(
+            jql, extra_fields=extra_fields, expand=None if lazy_changelog else "changelog"
+        )
+        parent_keys = self._parent_keys_to_resolve(issues)
+        parent_epic_links = await async_jira.resolve_parent_epics(parent_keys) if parent_keys else {}
+        issues, issue_teams = self._assign_teams(issues, parent_epic_links, selected_team)
+        if lazy_changelog:
+            await async_jira.fetch_record_changelogs(issues)
+        else:
+            await async_jira.complete_record_changelogs(issues)
+        return issues, self._issue_details(issues, issue_teams, calendar)
+
+    async def _fetch_report_data_async(self, async_jira, section, calendar, selected_team: str = "All") -> ReportData:
+        logger.info(f"Fetching issues for report: {section.report_config['name']}")
+        _, issue_details = await self._fetch_issue_details_async(async_jira, section.jql, calendar, selected_team)
+        return self._report_data(section.report_config["name"], section.jql, issue_details)
+
+    async def _fetch_partitioned_reports_async(self, async_jira, plan: QueryPlan, calendar, selected_team: str = "All") -> List[ReportData]:
+        logger.info(
+            f"Fetching {len(plan.partitioned)} report sections with one superset query: {plan.superset_jql}"
+        )
+        issues, issue_details = await self._fetch_issue_details_async(
+            async_jira, plan.superset_jql, calendar, selected_team, extra_fields=plan.fields
+        )
+        return self._partition_sections(plan, issues, issue_details)
+
+    async def _fetch_reports_async(self, async_jira, reports, release_version, calendar, selected_statuses: List[str] = [], selected_team: str = "All", selected_priorities: List[str] = [], selected_severities: List[str] = []):
+        section_jqls = {
+            report_config["name"]: self._build_report_jql(report_config, release_version, selected_statuses, selected_priorities, selected_severities)
+            for report_config in reports
+        }
+        plan = plan_sections(section_jqls, reports)
+
+        fetches = [self._fetch_report_data_async(async_jira, section, calendar, selected_team) for section in plan.standalone]
+        fetch_sections = [[section.report_config] for section in plan.standalone]
+        if plan.partitioned:
+            fetches.append(self._fetch_partitioned_reports_async(async_jira, plan, calendar, selected_team))
+            fetch_sections.append([section.report_config for section in plan.partitioned])
+
         reports_data = []
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_report = {
-                executor.submit(
-                    self._fetch_report_data,
-                    report_config,
-                    release_version,
-                    selected_statuses,
-                ): report_config
-                for report_config in reports
-            }
-            for future in concurrent.futures.as_completed(future_to_report):
-                report_config = future_to_report[future]
-                try:
-                    data = future.result()
-                    reports_data.append(data)
-                except Exception as exc:
-                    logger.error(f"{report_config['name']} generated an exception: {exc}")
+        for report_configs, result in zip(fetch_sections, await asyncio.gather(*fetches, return_exceptions=True)):
+            if isinstance(result, Exception):
+                for report_config in report_configs:
+                    logger.error(f"{report_config['name']} generated an exception: {result}")
+            else:
+                reports_data.extend(result if isinstance(result, list) else [result])
+
+        report_order = {report_config["name"]: index for index, report_config in enumerate(reports)}
+        reports_data.sort(key=lambda report_data: report_order[report_data.name])
+        return reports_data
+
+    def build_release_dataset(self, release_version) -> ReleaseDataset:
+        """Fetch every issue of the release once and index it for _dataset_reports."""
+        reports = self.config.get("reports", [])
+        base_jql = self._release_jql(release_version)
+        # Sections without their status clause; selected statuses are applied from the index.
+        section_jqls = {report_config["name"]: self._build_report_jql(report_config, release_version) for report_config in reports}
+        plan = plan_against_base(section_jqls, reports, base_jql)
+        severity_field = self._severity_field()
+        fields = plan.fields + [severity_field] if severity_field and severity_field not in plan.fields else plan.fields
+
+        holidays = self._holidays()
+        with self._jira_client_lease(set(holidays)) as self.jira_client:
+            if self.issue_store:
+                self.issue_store.sync_release(self.jira_client, release_version, base_jql, self._store_fields(release_version))
+                issues = self.issue_store.load_release(release_version, fields)
+            else:
+                issues = self.jira_client.search_records(base_jql, extra_fields=fields)
+            parent_keys = self._parent_keys_to_resolve(issues)
+            parent_epic_links = self.jira_client.resolve_parent_epics(parent_keys) if parent_keys else {}
+            issues, issue_teams = self._assign_teams(issues, parent_epic_links)
+            self.jira_client.complete_record_changelogs(issues)
+            issue_details = self._issue_details(issues, issue_teams, self.jira_client.calendar)
+        return ReleaseDataset.build(release_version, issues, issue_teams, issue_details, plan.partitioned, severity_field)
+
+    def _dataset_reports(self, reports, release_version, selected_team: str = "All", selected_statuses: List[str] = [], selected_priorities: List[str] = [], selected_severities: List[str] = []):
+        # None when the release dataset is off or cannot answer these sections; the caller then queries Jira.
+        if self.release_datasets is None:
+            return None
+        try:
+            dataset = self.release_datasets.get(
+                release_version, partial(_build_release_dataset, self.config_path, self.jira_pool, release_version)
+            )
+        except Exception as e:
+            logger.error(f"Release dataset for {release_version} unavailable, querying Jira directly: {e}")
+            return None
+        if not dataset.answers([report_config["name"] for report_config in reports], selected_severities):
+            logger.info(f"Release dataset for {release_version} cannot answer these sections, querying Jira directly")
+            return None
+
+        reports_data = [
+            self._report_data(
+                report_config["name"],
+                self._build_report_jql(report_config, release_version, selected_statuses, selected_priorities, selected_severities),
+                dataset.issue_details,
+                dataset.select(report_config["name"], selected_team, selected_statuses, selected_priorities, selected_severities),
+            )
+            for report_config in reports
+        ]
+        self._report_sections_ready(reports_data, {report_data.name: index for index, report_data in enumerate(reports_data)})
         return reports_data
 
+    def _process_all_issues_reports(self, reports, release_version, selected_statuses: List[str] = [], selected_team: str = "All", selected_priorities: List[str] = [], selected_severities: List[str] = []):
+        return self._fetch_reports(reports, release_version, selected_statuses, selected_team, selected_priorities, selected_severities)
+
+    def _process_open_issues_reports(self, reports, release_version, selected_statuses: List[str] = [], selected_team: str = "All", selected_priorities: List[str] = [], selected_severities: List[str] = []):
+        return self._fetch_reports(reports, release_version, selected_statuses, selected_team, selected_priorities, selected_severities)
+
     def _send_email_report(
         self,
-        html_report,
         report_type,
         days_since_branch_cut,
         release_version,
@@ -372,19 +901,21 @@ class Reporter:
         if run_settings.get("send_email_report"):
             logger.info("Sending email report...")
 
-            # Read the CSS content from index.css
-            frontend_css_path = Path(__file__).parent.parent.parent / "webapp" / "frontend" / "src" / "index.css"
-            css_text = ""
-            if frontend_css_path.exists():
-                with open(frontend_css_path, "r") as f:
-                    css_text = f.read()
-
-            # Remove h1 tag from html_report for email body
-            html_report_for_email = re.sub(r'<h1.*?>(.*?)</h1>', '', html_report, flags=re.DOTALL)
+            css_text = read_email_css()
+            compact = run_settings.get("email_format", "inline") == "compact"
+            max_rows_per_section = run_settings.get("email_max_rows_per_section")
 
-            # Inline CSS using Premailer
-            p = Premailer(html_report_for_email, css_text=css_text, keep_style_tags=False, remove_classes=False)
-            inlined_html_report = p.transform()
+            # Every email body is assembled from the same rendered and inlined team tables.
+            fragments = ReportFragments(
+                report_type,
+                reports_data,
+                self.config.get("sla"),
+                self.main_config.get("jira")["server"],
+                self.release_info,
+                days_since_branch_cut,
+                self._holidays(),
+                css_text=css_text,
+            )
 
             sender_email, sender_password, smtp_server, smtp_port = self.credentials.get_email_credentials()
 
@@ -446,35 +977,20 @@ class Reporter:
 
             if send_per_team_emails:
                 logger.info("Sending per-team emails...")
-                team_issues = {}
-                for report_data_item in reports_data:
-                    for issue in report_data_item.issues:
-                        if issue.team not in team_issues:
-                            team_issues[issue.team] = []
-                        team_issues[issue.team].append(issue)
-                
                 team_email_distros = self.config.get("team_email_distros", {})
 
-                for team, issues_list in team_issues.items():
+                for team in fragments.teams():
                     team_recipients = team_email_distros.get(team, [])
                     if not team_recipients:
                         logger.warning(f"No email distribution found for team: {team}. Skipping per-team email.")
                         continue
-                    
-                    # Generate a mini-report for the team
-                    team_report_data = [ReportData(name=f"{team} Issues", jql="", issues=issues_list)]
-                    team_html_report = self._generate_report(
-                        team_report_data,
-                        report_type, # Use the main report_type for template selection
-                        jira_server_url,
-                        days_since_branch_cut,
-                        release_version,
-                        holidays,
-                    )
-                    
-                    # Inline CSS for team email
-                    p_team = Premailer(team_html_report, css_text=css_text, keep_style_tags=False, remove_classes=False)
-                    inlined_team_html_report = p_team.transform()
+
+                    if compact:
+                        inlined_team_html_report = fragments.compact_email_body(
+                            team=team, include_title=True, max_rows_per_section=max_rows_per_section
+                        )
+                    else:
+                        inlined_team_html_report = fragments.email_body(team=team, include_title=True)
 
                     team_subject = f"{release_version} - Regression - {report_type_text} - {team}{day_suffix}"
 
@@ -493,16 +1009,25 @@ class Reporter:
                     )
                 logger.info("Per-team emails sent.")
             else: # Send main email if not sending per-team emails
+                if compact:
+                    body = fragments.compact_email_body(max_rows_per_section=max_rows_per_section)
+                else:
+                    body = fragments.email_body()
                 send_email(
                     sender=sender_email,
                     recipients=recipients,
                     cc_recipients=None,
                     bcc_recipients=bcc_recipients,
                     subject=subject,
-                    body=inlined_html_report,
+                    body=body,
                     smtp_server=smtp_server,
                     smtp_port=int(smtp_port),
                     smtp_user=sender_email,
                     smtp_password=sender_password,
                     attachment_path=attachment_path,
                 )
+
+
+def _build_release_dataset(config_path, jira_pool, release_version):
+    # A Reporter of its own, so a background refresh never shares a request's Jira client.
+    return Reporter(config_path, jira_pool=jira_pool).build_release_dataset(release_version)
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+from .logger import logger
+
+# 0 leaves the rate to AIMD and Retry-After; set a rate only for hosts that need a fixed cap.
+DEFAULT_REQUESTS_PER_SECOND = 0
+DEFAULT_BURST = 20
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_LATENCY_TARGET_MS = 2000
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+# How often a waiting coroutine re-checks for a free slot.
+ASYNC_POLL_SECONDS = 0.05
+
+# Responses that mean "slow down and try again".
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def throttle_pause(retry_after_header, attempt):
+    # Honor the server's Retry-After; otherwise back off exponentially.
+    retry_after = parse_retry_after(retry_after_header)
+    if retry_after is not None:
+        return min(retry_after, MAX_BACKOFF_SECONDS)
+    return min(BACKOFF_SECONDS * 2 ** attempt, MAX_BACKOFF_SECONDS)
+
+
+class RequestGovernor:
+    """Admission control for every request sent to one Jira host.
+
+    An optional token bucket caps the request rate. Concurrency follows an AIMD
+    policy: each fast response raises the limit by ``1 / limit``, so it
+    grows by about one per round trip. A slow response cuts it by 10% and
+    a throttled one halves it. After a 429/503 nobody is admitted until
+    the Retry-After pause is over. Blocking and asyncio callers share the
+    same state.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=DEFAULT_BURST,
+                 min_concurrency=DEFAULT_MIN_CONCURRENCY, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 latency_target_ms=DEFAULT_LATENCY_TARGET_MS, max_retries=DEFAULT_MAX_RETRIES, name="jira"):
+        self.name = name
+        self.requests_per_second = float(requests_per_second or 0)
+        self.burst = max(1.0, float(burst))
+        self.min_concurrency = max(1, int(min_concurrency))
+        self.max_concurrency = max(self.min_concurrency, int(max_concurrency))
+        self.latency_target_seconds = float(latency_target_ms) / 1000
+        self.max_retries = int(max_retries)
+        self.limit = float(max(self.min_concurrency, self.max_concurrency // 2))
+
+        self._lock = threading.Lock()
+        self._slot_released = threading.Condition(self._lock)
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+    def _try_acquire(self):
+        # 0 when a slot was taken; otherwise seconds to wait, or None to wait for a release.
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight >= int(self.limit):
+            return None
+        if self.requests_per_second:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.requests_per_second)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.requests_per_second
+            self._tokens -= 1
+        self._in_flight += 1
+        return 0
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return time.monotonic()
+                self._slot_released.wait(wait)
+
+    async def acquire_async(self):
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+            if wait == 0:
+                return time.monotonic()
+            await asyncio.sleep(ASYNC_POLL_SECONDS if wait is None else wait)
+
+    def release(self, started_at, status_code=None, pause_seconds=None):
+        """Return a slot. ``status_code`` is None when the request failed without a response."""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            if status_code in THROTTLE_STATUSES:
+                self._decrease(now, 0.5)
+                self._paused_until = max(self._paused_until, now + (pause_seconds or 0))
+            elif status_code is not None:
+                if now - started_at > self.latency_target_seconds:
+                    self._decrease(now, 0.9)
+                else:
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._slot_released.notify_all()
+
+    def _decrease(self, now, factor):
+        # One cut per latency window: a burst of throttled responses from the
+        # same overload should not collapse the limit to the minimum.
+        if now - self._last_decrease < self.latency_target_seconds:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(self.min_concurrency, self.limit * factor)
+        logger.debug(f"{self.name}: concurrency limit {previous:.1f} -> {self.limit:.1f}")
+
+
+class GovernedAdapter(HTTPAdapter):
+    """requests adapter that routes every send through a RequestGovernor and retries throttled responses."""
+
+    def __init__(self, governor, **kwargs):
+        self.governor = governor
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.governor.max_retries + 1):
+            started_at = self.governor.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                self.governor.release(started_at)
+                raise
+            if response.status_code not in THROTTLE_STATUSES:
+                self.governor.release(started_at, response.status_code)
+                return response
+            pause = throttle_pause(response.headers.get("Retry-After"), attempt)
+            self.governor.release(started_at, response.status_code, pause)
+            if attempt == self.governor.max_retries:
+                break
+            logger.warning(
+                f"Jira throttled {request.method} {request.url} ({response.status_code}); "
+                f"retrying in {pause:.1f}s ({attempt + 1}/{self.governor.max_retries})"
+            )
+            response.close()
+        return response
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(server_url, rate_limit_config=None) -> RequestGovernor:
+    # One governor per host for the whole process, shared by pooled, per-run and async clients.
+    rate_limit_config = dict(rate_limit_config or {})
+    host = urlparse(server_url).netloc or server_url
+    host_overrides = rate_limit_config.pop("hosts", None) or {}
+    rate_limit_config.update(host_overrides.get(host, {}))
+    with _governors_lock:
+        governor = _governors.get(host)
+        if governor is None:
+            governor = _governors[host] = RequestGovernor(
+                requests_per_second=rate_limit_config.get("requests_per_second", DEFAULT_REQUESTS_PER_SECOND),
+                burst=rate_limit_config.get("burst", DEFAULT_BURST),
+                min_concurrency=rate_limit_config.get("min_concurrency", DEFAULT_MIN_CONCURRENCY),
+                max_concurrency=rate_limit_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+                latency_target_ms=rate_limit_config.get("latency_target_ms", DEFAULT_LATENCY_TARGET_MS),
+                max_retries=rate_limit_config.get("max_retries", DEFAULT_MAX_RETRIES),
+                name=host,
+            )
+        return governor
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytz
+
+from .business_calendar import get_calendar
+from .models import EnrichedIssue, EnrichedSection, ReportData
+
+est_timezone = pytz.timezone('America/New_York')
+
+DEFAULT_SLA_HOURS = 48
+SLA_WARNING_RATIO = 0.75
+NO_TEAM = "no epic tagged"
+
+
+def _format_hours_to_h_m(duration):
+    if duration is None:
+        return "N/A"
+    if isinstance(duration, (int, float)):
+        total_minutes = int(round(duration * 60))
+    elif isinstance(duration, timedelta):
+        total_minutes = int(duration.total_seconds() / 60)
+    else:
+        return "N/A"
+
+    h = total_minutes // 60
+    m = total_minutes % 60
+    return f"{h} hrs {m} min"
+
+
+def _format_time_in_each_status(time_in_each_status):
+    items = [f"<li>{status}: {_format_hours_to_h_m(hours)}</li>" for status, hours in time_in_each_status.items() if status != 'Done']
+    return f"<ul style='margin: 0; padding: 0; list-style-type: none;'>{''.join(items)}</ul>"
+
+
+def _row_class(time_in_status, sla):
+    if time_in_status > sla:
+        return "sla-breached"
+    if sla * SLA_WARNING_RATIO <= time_in_status < sla:
+        return "sla-warning"
+    return "sla-ok"
+
+
+def enrich_sections(reports_data: List[ReportData], sla_config, holidays, now=None) -> List[EnrichedSection]:
+    """Compute every displayed SLA value for all sections ahead of rendering.
+
+    Business hours open for every issue of every section come from a single
+    vectorized calendar call, measured against one snapshot clock, so the
+    templates only print strings.
+    """
+    now = now or datetime.now(timezone.utc)
+    issues = [issue for report_data in reports_data for issue in report_data.issues]
+    end_dates = [issue.resolution_date or now for issue in issues]
+    business_hours = get_calendar(holidays).business_hours_batch(
+        (issue.created, end_date) for issue, end_date in zip(issues, end_dates)
+    ).tolist()
+
+    enriched = iter(
+        _enrich_issue(issue, end_date, hours, sla_config)
+        for issue, end_date, hours in zip(issues, end_dates, business_hours)
+    )
+    sections = []
+    for report_data in reports_data:
+        issues_by_team = {}
+        for issue in report_data.issues:
+            issues_by_team.setdefault(issue.team or NO_TEAM, []).append(next(enriched))
+        sections.append(EnrichedSection(
+            name=report_data.name,
+            jql=report_data.jql,
+            issues_by_team=sorted(issues_by_team.items(), key=lambda item: (item[0] == NO_TEAM, item[0])),
+        ))
+    return sections
+
+
+def _enrich_issue(issue, end_date, business_hours_open, sla_config) -> EnrichedIssue:
+    sla = sla_config.get(issue.priority, DEFAULT_SLA_HOURS)
+    time_in_status = issue.time_in_status
+    return EnrichedIssue(
+        key=issue.key,
+        summary=issue.summary,
+        assignee=issue.assignee,
+        assignee_email=issue.assignee_email,
+        reporter=issue.reporter,
+        reporter_email=issue.reporter_email,
+        priority=issue.priority,
+        status=issue.status,
+        sla=sla,
+        reported_time=issue.created.astimezone(est_timezone).strftime('%I:%M %p %d-%b-%y'),
+        total_time_open=_format_hours_to_h_m((end_date - issue.created).total_seconds() / 3600),
+        business_hours_open=_format_hours_to_h_m(business_hours_open),
+        time_in_status=_format_hours_to_h_m(time_in_status),
+        time_to_assign=_format_hours_to_h_m(issue.time_to_assign),
+        time_in_each_status=_format_time_in_each_status(issue.time_in_each_status),
+        row_class=_row_class(time_in_status, sla),
+        sla_status="Not Met" if time_in_status > sla else "Met",
+        root_cause=getattr(issue, 'root_cause', 'N/A'),
+        rca_category=getattr(issue, 'rca_category', 'N/A'),
+    )
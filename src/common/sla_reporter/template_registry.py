@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from .logger import logger
+
+DEFAULT_BYTECODE_CACHE_DIR = "reports/.jinja_cache"
+DEFAULT_CHECK_INTERVAL_SECONDS = 2
+
+
+class TemplateRegistry:
+    """Compiled report templates kept in memory for the life of the process.
+
+    Compiled bytecode is also persisted to ``bytecode_cache_dir`` so a fresh
+    CLI run or webapp worker loads it instead of parsing the sources; the
+    cache directory is created with the first compiled template. The
+    sources' mtimes are re-checked by ``refresh`` and, unless
+    ``check_interval_seconds`` is None, by lookups at most that often, so
+    edited templates are picked up without a restart.
+    """
+
+    def __init__(self, templates_dir, bytecode_cache_dir=DEFAULT_BYTECODE_CACHE_DIR,
+                 check_interval_seconds=DEFAULT_CHECK_INTERVAL_SECONDS):
+        self.templates_dir = Path(templates_dir)
+        self.check_interval_seconds = check_interval_seconds
+        self.env = Environment(
+            loader=FileSystemLoader(self.templates_dir),
+            # The registry decides when sources are re-checked, not every get_template call.
+            auto_reload=False,
+        )
+        self._bytecode_cache_dir = bytecode_cache_dir
+        self._templates = {}
+        self._lock = threading.Lock()
+        self._mtimes = self._source_mtimes()
+        self._checked_at = time.monotonic()
+
+    @staticmethod
+    def _bytecode_cache(bytecode_cache_dir):
+        if not bytecode_cache_dir:
+            return None
+        cache_dir = Path(__file__).parent.parent.parent.parent / bytecode_cache_dir
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Template bytecode cache disabled, cannot create {cache_dir}: {e}")
+            return None
+        return FileSystemBytecodeCache(str(cache_dir))
+
+    def _source_mtimes(self):
+        # Every template, so a change to a base or included template invalidates its children too.
+        mtimes = {}
+        for name in self.env.list_templates():
+            try:
+                mtimes[name] = os.stat(self.templates_dir / name).st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    def get(self, name):
+        if self.check_interval_seconds is not None and time.monotonic() - self._checked_at >= self.check_interval_seconds:
+            self.refresh()
+        template = self._templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    if self._bytecode_cache_dir:
+                        self.env.bytecode_cache = self._bytecode_cache(self._bytecode_cache_dir)
+                        self._bytecode_cache_dir = None
+                    template = self._templates[name] = self.env.get_template(name)
+        return template
+
+    def refresh(self):
+        mtimes = self._source_mtimes()
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if mtimes == self._mtimes:
+                return False
+            self._mtimes = mtimes
+            self._templates = {}
+            self.env.cache.clear()
+        logger.info(f"Report templates changed on disk; recompiling from {self.templates_dir}")
+        return True
+
+    def warm(self):
+        for name in self.env.list_templates(extensions=["html"]):
+            self.get(name)
+        return len(self._templates)
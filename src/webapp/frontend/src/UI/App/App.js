@@ -119,7 +119,7 @@ function App() {
         includeAllAppTeams ||
         sendPerTeamEmails;
 
-      const response = await axios.post('/api/generate-report', {
+      const response = await axios.post('/api/jobs', {
         report_type: reportType,
         release_version: releaseVersion,
         selected_team: selectedTeam,
@@ -138,7 +138,34 @@ function App() {
         include_all_app_teams: includeAllAppTeams,
         send_per_team_emails: sendPerTeamEmails,
       });
-      setReport(response.data.report);
+      const { job_id: jobId } = response.data;
+
+      // Show each report section as soon as it is fetched, then the full report once the job is done.
+      await new Promise((resolve, reject) => {
+        const events = new EventSource(`/api/jobs/${jobId}/events`);
+        const sections = [];
+        events.addEventListener('section', (event) => {
+          const section = JSON.parse(event.data);
+          sections[section.position] = section.html;
+          setReport(sections.filter(Boolean).join(''));
+        });
+        events.addEventListener('done', () => {
+          events.close();
+          resolve();
+        });
+        events.addEventListener('failed', (event) => {
+          events.close();
+          reject(new Error(JSON.parse(event.data).error));
+        });
+        events.onerror = () => {
+          if (events.readyState === EventSource.CLOSED) {
+            reject(new Error('Lost connection to the report job.'));
+          }
+        };
+      });
+
+      const result = await axios.get(`/api/jobs/${jobId}/result`);
+      setReport(result.data.report);
 
       if (shouldSendEmail) {
         setOverlayMessage('Your report has been successfully generated and emailed.');
@@ -151,7 +178,7 @@ function App() {
     } catch (error) {
       console.error('Error generating report:', error);
       setReport('<p class="text-danger">Error generating report.</p>');
-      setOverlayMessage('There was an issue generating your report. Please try again.');
+      setOverlayMessage(error.response?.data?.error || 'There was an issue generating your report. Please try again.');
       setOverlayMessageType('error');
       setShowMessageOverlay(true);
     }
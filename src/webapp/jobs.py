@@ -0,0 +1,150 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+import uuid
+
+from src.common.sla_reporter.logger import logger
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_QUEUE_SIZE = 20
+DEFAULT_JOB_RETENTION_SECONDS = 3600
+# Idle SSE connections get a comment line this often so proxies keep them open.
+SSE_KEEPALIVE_SECONDS = 15
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class ReportJob:
+    """One background report and every progress event it has emitted.
+
+    Events are kept in order, so a client can connect at any time and
+    replay them from the start or from its Last-Event-ID.
+    """
+
+    def __init__(self, job_id, loop):
+        self.id = job_id
+        self.status = "queued"
+        self.created = time.time()
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self._loop = loop
+        self._changed = asyncio.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    def summary(self):
+        return {"job_id": self.id, "status": self.status, "events": len(self.events), "error": self.error}
+
+    def emit(self, event, data, status=None):
+        # Called from worker threads; listeners are woken on the event loop.
+        with self._lock:
+            self.events.append((event, data))
+            if status:
+                self.status = status
+                if self.done:
+                    self.finished = time.time()
+        try:
+            self._loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            # The event loop is gone, and with it every listener.
+            pass
+
+    def _wake(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _wait_for_events(self, seen):
+        # False when nothing happened for SSE_KEEPALIVE_SECONDS.
+        changed = self._changed
+        if len(self.events) > seen or self.done:
+            return True
+        try:
+            await asyncio.wait_for(changed.wait(), SSE_KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def event_stream(self, last_event_id=None):
+        seen = last_event_id + 1 if last_event_id is not None else 0
+        while True:
+            events = self.events[seen:]
+            for offset, (event, data) in enumerate(events):
+                yield f"id: {seen + offset}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+            seen += len(events)
+            if self.done and seen >= len(self.events):
+                return
+            if not await self._wait_for_events(seen):
+                yield ": keep-alive\n\n"
+
+
+class ReportJobManager:
+    """Runs report jobs on a dedicated, bounded worker pool.
+
+    At most max_workers reports build at once and at most queue_size more
+    wait for a worker; further submissions are refused instead of queued
+    without bound. Finished jobs are kept for retention_seconds so clients
+    can still read their events and result.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, queue_size=DEFAULT_JOB_QUEUE_SIZE,
+                 retention_seconds=DEFAULT_JOB_RETENTION_SECONDS):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.retention_seconds = retention_seconds
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, run) -> ReportJob:
+        """Queue run(progress) and return its job. Must be called from the event loop."""
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull(f"{self.max_workers + self.queue_size} report jobs are already queued or running.")
+        self._prune()
+        job = ReportJob(uuid.uuid4().hex, asyncio.get_running_loop())
+        with self._lock:
+            self._jobs[job.id] = job
+        job.emit("stage", {"stage": "queued"})
+        try:
+            self._executor.submit(self._run, job, run)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        logger.info(f"Queued report job {job.id}")
+        return job
+
+    def _run(self, job: ReportJob, run):
+        try:
+            job.emit("stage", {"stage": "running"}, status="running")
+            job.result = run(job.emit)
+        except Exception as e:
+            logger.error(f"Report job {job.id} failed: {e}")
+            job.error = str(e)
+            job.emit("failed", {"error": job.error}, status="failed")
+        else:
+            job.emit("done", {"job_id": job.id}, status="done")
+            logger.info(f"Report job {job.id} finished")
+        finally:
+            self._slots.release()
+
+    def get(self, job_id):
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job.done and job.finished < cutoff]:
+                del self._jobs[job_id]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,14 +1,61 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, Query
+from functools import partial
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 import os
+from pathlib import Path
 from src.common.sla_reporter.reporter import Reporter
 from src.common.sla_reporter.config import load_release_config, Config
+from src.common.sla_reporter.jira_pool import JiraClientPool, DEFAULT_POOL_SIZE
+from src.common.sla_reporter.async_jira_client import AsyncJiraClient
+from src.common.sla_reporter.report_generator import template_registry
+from src.common.sla_reporter.template_registry import DEFAULT_CHECK_INTERVAL_SECONDS
+from src.common.sla_reporter.report_export import EXPORT_MEDIA_TYPES
+from src.common.sla_reporter.report_json import DEFAULT_PAGE_SIZE, StaleCursor, decode_cursor, page_columns, page_etag, report_page
 from src.common.sla_reporter.logger import logger
+from src.common.credentials import Credentials
+from src.webapp.jobs import (
+    DEFAULT_JOB_QUEUE_SIZE,
+    DEFAULT_JOB_RETENTION_SECONDS,
+    DEFAULT_JOB_WORKERS,
+    JobQueueFull,
+    ReportJobManager,
+)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pool of authenticated Jira clients for the lifetime of the process.
+    main_config = Config("config/config.yaml")
+    jira_config = main_config.get("jira", {})
+    pool_size = int(jira_config.get("client_pool_size", DEFAULT_POOL_SIZE))
+    app.state.jira_pool = JiraClientPool(Credentials(), size=pool_size)
+    logger.info(f"Jira client pool ready (size {pool_size})")
+    try:
+        app.state.async_jira = AsyncJiraClient.from_config(Credentials(), jira_config)
+    except ConnectionError as e:
+        logger.error(f"Async Jira client unavailable, reports will use the blocking client: {e}")
+        app.state.async_jira = None
+    templates_config = main_config.get("templates", {}) or {}
+    template_registry.check_interval_seconds = templates_config.get("check_interval_seconds", DEFAULT_CHECK_INTERVAL_SECONDS)
+    logger.info(f"Compiled {template_registry.warm()} report templates")
+    webapp_config = main_config.get("webapp", {}) or {}
+    app.state.report_jobs = ReportJobManager(
+        max_workers=int(webapp_config.get("job_workers", DEFAULT_JOB_WORKERS)),
+        queue_size=int(webapp_config.get("job_queue_size", DEFAULT_JOB_QUEUE_SIZE)),
+        retention_seconds=int(webapp_config.get("job_retention_seconds", DEFAULT_JOB_RETENTION_SECONDS)),
+    )
+    yield
+    app.state.report_jobs.shutdown()
+    app.state.jira_pool.close()
+    if app.state.async_jira:
+        await app.state.async_jira.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/api/debug/env")
 def debug_env():
@@ -94,18 +141,15 @@ def get_email_groups():
     logger.debug(f"Email groups returned: {email_groups}")
     return email_groups
 
-@app.post("/api/generate-report")
-def generate_report(request: ReportRequest):
-    reporter = Reporter()
-    report_type_mapping = {
-        "All Issues": "all_issues",
-        "Open Issues": "open_issues"
-    }
-    internal_report_type = report_type_mapping.get(request.report_type, request.report_type) # Fallback to original if not found
+REPORT_TYPE_MAPPING = {
+    "All Issues": "all_issues",
+    "Open Issues": "open_issues"
+}
 
-    report_html = reporter.run_webapp(
+def _report_arguments(request: ReportRequest):
+    return dict(
         release_version=request.release_version,
-        report_type=internal_report_type,
+        report_type=REPORT_TYPE_MAPPING.get(request.report_type, request.report_type), # Fallback to original if not found
         selected_team=request.selected_team,
         selected_statuses=request.selected_statuses,
         selected_priorities=request.selected_priorities,
@@ -122,13 +166,122 @@ def generate_report(request: ReportRequest):
         send_per_team_emails=request.send_per_team_emails,
         send_email_report=request.send_email_report
     )
+
+@app.post("/api/generate-report")
+async def generate_report(request: ReportRequest):
+    reporter = Reporter(jira_pool=app.state.jira_pool)
+    report_html = await reporter.run_webapp_async(app.state.async_jira, **_report_arguments(request))
     return {"report": report_html}
 
+@app.post("/api/generate-report/stream")
+async def generate_report_stream(request: ReportRequest):
+    reporter = Reporter(jira_pool=app.state.jira_pool)
+    report_chunks = await reporter.stream_webapp_async(app.state.async_jira, **_report_arguments(request))
+    # A plain iterator: Starlette renders each chunk in its threadpool, off the event loop.
+    return StreamingResponse(report_chunks, media_type="text/html")
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    # Weak comparison, as If-None-Match calls for.
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+@app.get("/api/report-data")
+async def get_report_data(
+    release_version: str,
+    report_type: str,
+    selected_team: str = "All",
+    selected_statuses: List[str] = Query([]),
+    selected_priorities: List[str] = Query([]),
+    selected_severities: List[str] = Query([]),
+    selected_platforms: List[str] = Query([]),
+    columns: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    if_none_match: Optional[str] = Header(None),
+):
+    # The report as typed JSON rows, one page at a time. The HTML endpoints remain for email and downloads.
+    try:
+        selected_columns = page_columns(columns.split(",") if columns else None)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    reporter = Reporter(jira_pool=app.state.jira_pool)
+    report = await reporter.structured_report_async(
+        app.state.async_jira,
+        release_version,
+        REPORT_TYPE_MAPPING.get(report_type, report_type),
+        selected_team,
+        selected_statuses,
+        selected_priorities,
+        selected_severities,
+        selected_platforms,
+        # Later pages and revalidations read the report the first page built.
+        refresh=not cursor and not if_none_match,
+    )
+    if report is None:
+        return JSONResponse(status_code=404, content={"error": f"Release '{release_version}' not found in release config."})
+
+    # Check the cursor first, so a malformed or stale one never gets a 304.
+    try:
+        if cursor:
+            decode_cursor(cursor, report.version)
+    except StaleCursor as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    headers = {"ETag": page_etag(report, selected_columns, cursor, limit), "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=report_page(report, selected_columns, cursor, limit), headers=headers)
+
+def _run_report_job(jira_pool, report_arguments, progress):
+    reporter = Reporter(jira_pool=jira_pool)
+    return reporter.run_webapp(**report_arguments, progress=progress)
+
+@app.post("/api/jobs", status_code=202)
+async def submit_report_job(request: ReportRequest):
+    try:
+        job = app.state.report_jobs.submit(partial(_run_report_job, app.state.jira_pool, _report_arguments(request)))
+    except JobQueueFull as e:
+        return JSONResponse(status_code=429, content={"error": str(e)})
+    return job.summary()
+
+@app.get("/api/jobs/{job_id}")
+def get_report_job(job_id: str):
+    job = app.state.report_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return job.summary()
+
+@app.get("/api/jobs/{job_id}/events")
+def stream_report_job_events(job_id: str, last_event_id: Optional[int] = Header(None)):
+    job = app.state.report_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return StreamingResponse(
+        job.event_stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/jobs/{job_id}/result")
+def get_report_job_result(job_id: str):
+    job = app.state.report_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    if job.status == "failed":
+        return JSONResponse(status_code=500, content={"error": job.error})
+    if job.status != "done":
+        return JSONResponse(status_code=202, content=job.summary())
+    return {"report": job.result}
+
 @app.get("/api/download-excel/{filename}")
 def download_excel_report(filename: str):
     file_path = os.path.join("reports", filename)
     if os.path.exists(file_path):
-        return FileResponse(path=file_path, filename=filename, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        media_type = EXPORT_MEDIA_TYPES.get(Path(filename).suffix.lstrip("."), "application/octet-stream")
+        return FileResponse(path=file_path, filename=filename, media_type=media_type)
     return {"error": "File not found"}
 
 @app.get("/manifest.json", include_in_schema=False)
@@ -0,0 +1,297 @@
+"""A local stand-in for the Jira REST endpoints the reporter's clients read.
+
+Serves a fixed set of synthetic issues with the same paging behaviour as
+Jira: Cloud searches page with nextPageToken and return fewer issues than
+asked for when changelogs are expanded, Server searches page with startAt,
+and long changelogs come back truncated. It also answers the serverInfo,
+myself and field reads the jira library makes on connect, so both
+SlaJiraClient (``jira.server``) and AsyncJiraClient (``jira.api_base_url``)
+can be pointed at it. Run it with --self-check to exercise both clients
+against it.
+
+    python utilities/jira_stub_server.py --port 8081
+    python utilities/jira_stub_server.py --self-check
+"""
+import argparse
+import asyncio
+import base64
+import os
+import re
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, HTTPException, Request
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EPIC_LINK_FIELD = "customfield_10014"
+STATUSES = ["Open", "In Progress", "In Review", "Done"]
+PRIORITIES = ["P0", "P1", "P2", "P3"]
+# Jira Cloud's own limits on one search page.
+MAX_RESULTS = 100
+MAX_RESULTS_WITH_CHANGELOG = 20
+EMBEDDED_CHANGELOG_LIMIT = 10
+
+
+def _timestamp(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+def _history(issue_index, history_index, created):
+    previous, current = STATUSES[history_index % 3], STATUSES[history_index % 3 + 1]
+    return {
+        "id": f"{issue_index}{history_index:03d}",
+        "created": _timestamp(created),
+        "items": [{"field": "status", "fromString": previous, "toString": current}],
+    }
+
+
+def make_issues(count=120, project="STUB", epics=3):
+    """Synthetic issues; every seventh one has a changelog longer than Jira embeds in a search."""
+    started = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+    issues = {}
+    for index in range(1, epics + 1):
+        key = f"{project}-E{index}"
+        issues[key] = {"key": key, "fields": {"summary": f"Epic {index}", EPIC_LINK_FIELD: None}, "histories": []}
+    for index in range(1, count + 1):
+        created = started + timedelta(hours=7 * index)
+        history_count = 25 if index % 7 == 0 else index % 4
+        issues[f"{project}-{index}"] = {
+            "key": f"{project}-{index}",
+            "fields": {
+                "summary": f"Stub issue {index}",
+                "status": {"name": STATUSES[index % len(STATUSES)]},
+                "priority": {"name": PRIORITIES[index % len(PRIORITIES)]},
+                "created": _timestamp(created),
+                "resolutiondate": _timestamp(created + timedelta(days=2)) if index % len(STATUSES) == 3 else None,
+                "assignee": {"displayName": f"Dev {index % 5}", "emailAddress": f"dev{index % 5}@example.com"},
+                "reporter": {"displayName": "Reporter", "emailAddress": "reporter@example.com"},
+                EPIC_LINK_FIELD: f"{project}-E{index % epics + 1}",
+                "parent": None,
+            },
+            "histories": [_history(index, n, created + timedelta(hours=n + 1)) for n in range(history_count)],
+        }
+    return issues
+
+
+def _select(issues, jql):
+    # Only key lists are understood; any other JQL selects every issue.
+    match = re.search(r"key\s+in\s*\(([^)]*)\)", jql or "", re.IGNORECASE)
+    if not match:
+        return list(issues)
+    keys = [key.strip() for key in match.group(1).split(",")]
+    return [key for key in keys if key in issues]
+
+
+def _render(issue, fields, expand):
+    wanted = fields or []
+    rendered = {"key": issue["key"], "fields": {name: value for name, value in issue["fields"].items() if name in wanted}}
+    if expand and "changelog" in expand:
+        histories = issue["histories"]
+        rendered["changelog"] = {
+            "startAt": 0,
+            "maxResults": EMBEDDED_CHANGELOG_LIMIT,
+            "total": len(histories),
+            "histories": histories[:EMBEDDED_CHANGELOG_LIMIT],
+        }
+    return rendered
+
+
+def _split(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part for part in value.split(",") if part]
+    return list(value)
+
+
+def create_app(issues=None, deployment_type="Cloud"):
+    """The stub's ASGI app; use it with httpx.ASGITransport or serve it with uvicorn."""
+    issues = make_issues() if issues is None else issues
+    app = FastAPI(title="Jira stub")
+    app.state.requests = []
+
+    @app.middleware("http")
+    async def record_requests(request: Request, call_next):
+        app.state.requests.append((request.method, request.url.path))
+        return await call_next(request)
+
+    @app.get("/rest/api/2/serverInfo")
+    async def server_info(request: Request):
+        version = [1001, 0, 0] if deployment_type == "Cloud" else [9, 12, 0]
+        return {
+            "baseUrl": str(request.base_url).rstrip("/"),
+            "deploymentType": deployment_type,
+            "version": ".".join(map(str, version)),
+            "versionNumbers": version,
+            "serverTitle": "Jira stub",
+        }
+
+    @app.get("/rest/api/2/myself")
+    async def myself():
+        return {"accountId": "stub", "name": "stub", "displayName": "Stub User", "emailAddress": "stub@example.com", "active": True}
+
+    @app.get("/rest/api/2/field")
+    async def field():
+        return [
+            {"id": "summary", "key": "summary", "name": "Summary", "custom": False},
+            {"id": "status", "key": "status", "name": "Status", "custom": False},
+            {"id": "priority", "key": "priority", "name": "Priority", "custom": False},
+            {"id": EPIC_LINK_FIELD, "key": EPIC_LINK_FIELD, "name": "Epic Link", "custom": True},
+        ]
+
+    def cloud_search(jql, fields, expand, max_results, next_page_token):
+        keys = _select(issues, jql)
+        limit = MAX_RESULTS_WITH_CHANGELOG if expand and "changelog" in expand else MAX_RESULTS
+        page_size = max(1, min(int(max_results or 50), limit))
+        offset = int(base64.urlsafe_b64decode(next_page_token).decode("ascii")) if next_page_token else 0
+        end = min(offset + page_size, len(keys))
+        page = {"issues": [_render(issues[key], fields, expand) for key in keys[offset:end]], "isLast": end >= len(keys)}
+        if end < len(keys):
+            page["nextPageToken"] = base64.urlsafe_b64encode(str(end).encode("ascii")).decode("ascii")
+        return page
+
+    @app.get("/rest/api/2/search/jql")
+    async def search_jql_get(jql: str, fields: str = "", expand: str = "", maxResults: int = 50, nextPageToken: str = None):
+        return cloud_search(jql, _split(fields), expand, maxResults, nextPageToken)
+
+    @app.post("/rest/api/2/search/jql")
+    async def search_jql_post(request: Request):
+        body = await request.json()
+        return cloud_search(body.get("jql"), _split(body.get("fields")), ",".join(_split(body.get("expand"))),
+                            body.get("maxResults"), body.get("nextPageToken"))
+
+    def server_search(jql, fields, expand, start_at, max_results):
+        keys = _select(issues, jql)
+        start_at = int(start_at or 0)
+        max_results = max(1, min(int(max_results or 50), MAX_RESULTS))
+        window = keys[start_at:start_at + max_results]
+        return {
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": len(keys),
+            "issues": [_render(issues[key], fields, expand) for key in window],
+        }
+
+    @app.get("/rest/api/2/search")
+    async def search_get(jql: str, fields: str = "", expand: str = "", startAt: int = 0, maxResults: int = 50):
+        return server_search(jql, _split(fields), expand, startAt, maxResults)
+
+    @app.post("/rest/api/2/search")
+    async def search(request: Request):
+        body = await request.json()
+        return server_search(body.get("jql"), _split(body.get("fields")), ",".join(_split(body.get("expand"))),
+                             body.get("startAt"), body.get("maxResults"))
+
+    @app.get("/rest/api/2/issue/{key}/changelog")
+    async def changelog(key: str, startAt: int = 0, maxResults: int = 100):
+        if key not in issues:
+            raise HTTPException(status_code=404, detail=f"Issue {key} does not exist")
+        histories = issues[key]["histories"]
+        return {"startAt": startAt, "maxResults": maxResults, "total": len(histories),
+                "values": histories[startAt:startAt + maxResults]}
+
+    @app.get("/rest/api/2/issue/{key}")
+    async def issue(key: str, fields: str = "", expand: str = ""):
+        if key not in issues:
+            raise HTTPException(status_code=404, detail=f"Issue {key} does not exist")
+        rendered = _render(issues[key], _split(fields), None)
+        if "changelog" in expand:
+            histories = issues[key]["histories"]
+            rendered["changelog"] = {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories}
+        return rendered
+
+    return app
+
+
+async def _check(deployment_type):
+    import httpx
+    from src.common.sla_reporter.async_jira_client import AsyncJiraClient
+
+    issues = make_issues()
+    app = create_app(issues, deployment_type)
+    client = AsyncJiraClient("http://jira-stub", "stub@example.com", "token", page_size=50,
+                             transport=httpx.ASGITransport(app=app))
+    try:
+        # Concurrent first calls must share one serverInfo probe.
+        await asyncio.gather(*(client.is_cloud() for _ in range(5)))
+        assert app.state.requests.count(("GET", "/rest/api/2/serverInfo")) == 1, "serverInfo probed more than once"
+
+        records = await client.search_records("project = STUB ORDER BY key")
+        records = await client.complete_record_changelogs(records)
+        assert [record.key for record in records] == list(issues), "search did not return every issue in order"
+        for record in records:
+            expected = len(issues[record.key]["histories"])
+            assert record.changelog_complete and len(record.histories) == expected, f"{record.key} changelog incomplete"
+
+        fetched = await client.fetch_record_changelogs(
+            [await _without_changelog(client, key) for key in list(issues)[:60]]
+        )
+        assert all(len(r.histories) == len(issues[r.key]["histories"]) for r in fetched), "changelog fetch incomplete"
+
+        epics = await client.resolve_parent_epics([key for key in issues if "-E" not in key][:30])
+        assert all(epics[key] == issues[key]["fields"][EPIC_LINK_FIELD] for key in epics), "wrong epic links"
+    finally:
+        await client.aclose()
+    print(f"{deployment_type}: {len(records)} issues, {len(app.state.requests)} requests, OK")
+
+
+async def _without_changelog(client, key):
+    records, _ = await client._search_records_page(f"key in ({key})", ["key"], None, ())
+    return records[0]
+
+
+def _check_blocking(deployment_type):
+    # The jira library talks HTTP through requests, so serve the stub on a free local port.
+    import uvicorn
+    from jira import JIRA
+
+    issues = make_issues()
+    app = create_app(issues, deployment_type)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        jira = JIRA(server=f"http://127.0.0.1:{port}", basic_auth=("stub@example.com", "token"), max_retries=0)
+        assert jira._is_cloud == (deployment_type == "Cloud"), "wrong deployment type"
+        jira.myself()
+        assert jira.fields(), "no fields"
+        parents = jira.search_issues("key in (STUB-1, STUB-2)", fields=EPIC_LINK_FIELD, maxResults=2)
+        assert {issue.key for issue in parents} == {"STUB-1", "STUB-2"}, "wrong search result"
+        jira.close()
+    finally:
+        server.should_exit = True
+        thread.join()
+    print(f"{deployment_type}: jira library connects and searches, OK")
+
+
+def self_check():
+    sys.path.insert(0, PROJECT_ROOT)
+    for deployment_type in ("Cloud", "Server"):
+        asyncio.run(_check(deployment_type))
+        _check_blocking(deployment_type)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--deployment-type", default="Cloud", choices=["Cloud", "Server"])
+    parser.add_argument("--self-check", action="store_true", help="Run both Jira clients against the stub and exit")
+    args = parser.parse_args()
+    if args.self_check:
+        self_check()
+        return
+    import uvicorn
+    uvicorn.run(create_app(deployment_type=args.deployment_type), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()